@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import Answer, Question, User
+from cache import payload_cache, ANALYTICS_NAMESPACE
+
+# Item statistics are recomputed at most this often
+ANALYTICS_TTL_SECONDS = float(os.getenv("ANALYTICS_TTL_SECONDS", "600"))
+
+ANSWER_ROW_DTYPE = np.dtype([
+    ("question_id", np.int64), ("choice_id", np.int64), ("is_correct", np.float64), ("total_score", np.float64)
+])
+
+
+def load_answer_arrays(db: Session):
+    """Pull every valid answer as parallel arrays in one query
+
+    Returns (question_ids, choice_ids, is_correct, total_scores) where
+    total_scores is the answering user's total_score.
+    """
+    query = select(
+        Answer.question_id,
+        Answer.choice_id,
+        Answer.is_correct,
+        func.coalesce(User.total_score, 0.0)
+    ).outerjoin(
+        User, User.id == Answer.user_id
+    ).where(
+        Answer.question_id.isnot(None),
+        Answer.choice_id.isnot(None)
+    )
+    # Read the DBAPI cursor straight into a structured array: building a Row per
+    # answer and converting those to numpy costs about ten times the query itself
+    connection = db.connection()
+    statement = str(query.compile(connection, compile_kwargs={"literal_binds": True}))
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(statement)
+        data = np.fromiter(cursor, dtype=ANSWER_ROW_DTYPE)
+    finally:
+        cursor.close()
+    return data["question_id"], data["choice_id"], data["is_correct"], data["total_score"]
+
+
+def compute_item_statistics(question_ids, choice_ids, is_correct, total_scores):
+    """Compute item statistics for every question in one vectorized pass
+
+    For each question: number of responses, p-value (fraction correct),
+    choice distribution and the point-biserial discrimination index between
+    answering correctly and the user's total score (None when undefined,
+    e.g. everyone answered correctly or all scores are equal).
+    """
+    if len(question_ids) == 0:
+        return []
+
+    questions, q_index = np.unique(question_ids, return_inverse=True)
+    n_questions = len(questions)
+    responses = np.bincount(q_index, minlength=n_questions)
+    correct = np.bincount(q_index, weights=is_correct, minlength=n_questions)
+    p_values = correct / responses
+
+    # Point-biserial correlation from grouped sums: r = (M1 - M) / S * sqrt(p / (1 - p))
+    score_sum = np.bincount(q_index, weights=total_scores, minlength=n_questions)
+    score_sq_sum = np.bincount(q_index, weights=total_scores * total_scores, minlength=n_questions)
+    correct_score_sum = np.bincount(q_index, weights=total_scores * is_correct, minlength=n_questions)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_all = score_sum / responses
+        std_all = np.sqrt(np.maximum(score_sq_sum / responses - mean_all * mean_all, 0.0))
+        mean_correct = correct_score_sum / correct
+        discrimination = (mean_correct - mean_all) / std_all * np.sqrt(p_values / (1.0 - p_values))
+    discrimination[~np.isfinite(discrimination)] = np.nan
+
+    # Choice distribution: count (question, choice) pairs encoded as a single integer key
+    stride = int(choice_ids.max()) + 1
+    pair_keys, pair_counts = np.unique(q_index.astype(np.int64) * stride + choice_ids, return_counts=True)
+    distributions = [{} for _ in range(n_questions)]
+    for question_position, choice_id, count in zip(
+        (pair_keys // stride).tolist(), (pair_keys % stride).tolist(), pair_counts.tolist()
+    ):
+        distributions[question_position][str(choice_id)] = count
+
+    return [
+        {
+            "question_id": question_id,
+            "responses": response_count,
+            "p_value": round(p_value, 4),
+            "discrimination": None if np.isnan(index) else round(index, 4),
+            "choice_distribution": distribution
+        }
+        for question_id, response_count, p_value, index, distribution in zip(
+            questions.tolist(), responses.tolist(), p_values.tolist(), discrimination.tolist(), distributions
+        )
+    ]
+
+
+def get_item_statistics(db: Session):
+    """Item statistics for every answered question, cached for ANALYTICS_TTL_SECONDS"""
+    def load():
+        items = compute_item_statistics(*load_answer_arrays(db))
+        texts = dict(db.query(Question.id, Question.question_text).all()) if items else {}
+        for item in items:
+            item["question_text"] = texts.get(item["question_id"])
+        return items
+
+    return payload_cache.get_or_load(ANALYTICS_NAMESPACE, "items", load, ttl_seconds=ANALYTICS_TTL_SECONDS)
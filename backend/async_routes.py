@@ -0,0 +1,107 @@
+"""Async versions of the hot read endpoints, served from the async engine.
+
+Registered by main.py ahead of the sync routes when ASYNC_DATABASE_URL is
+set. The queries themselves are the sync CRUD functions run through
+AsyncSession.run_sync, so the async engine drives the I/O (no Starlette
+threadpool thread is held while waiting on the database) while payloads,
+cache keys and invalidation stay exactly the same as on the sync path.
+
+Because those functions run on the event loop, everything they do besides
+async-engine I/O blocks every other request. Async mode therefore only
+supports the primary database and the in-memory payload cache: replicas
+would be bypassed, and the sqlite cache backend reads files on the loop.
+main.py keeps the sync routes when unsupported_reason() returns a reason.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import auth
+import crud
+import leaderboard
+import schemas
+from cache import payload_cache, MemoryBackend
+from database import get_async_db, replica_engines, User
+
+router = APIRouter()
+
+
+def unsupported_reason() -> Optional[str]:
+    """Why the configuration cannot be served by these handlers, or None if it can"""
+    if replica_engines:
+        return "READ_REPLICA_URLS is set and the async handlers only read from the primary"
+    if payload_cache.enabled and not isinstance(payload_cache.backend, MemoryBackend):
+        return "the payload cache backend blocks the event loop; use CACHE_BACKEND=memory"
+    return None
+
+
+@router.get("/quizzes")
+async def read_quizzes(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(crud.get_quizzes, skip, limit)
+
+
+@router.get("/quizzes/{quiz_id}")
+async def read_quiz(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get quiz with properly serialized questions"""
+    quiz = await db.run_sync(crud.get_quiz_with_questions, quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
+
+
+@router.get("/quiz-scores/{quiz_id}", response_model=List[schemas.QuizScoreResponse])
+async def get_quiz_leaderboard(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get leaderboard for a specific quiz"""
+    return await db.run_sync(crud.get_quiz_scores, quiz_id)
+
+
+@router.get("/quiz-scores/{quiz_id}/top", response_model=schemas.LeaderboardPage)
+async def get_quiz_leaderboard_top(
+    quiz_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of the ranked leaderboard for a specific quiz"""
+    return await db.run_sync(leaderboard.get_top, quiz_id, max(0, skip), max(0, min(limit, 100)))
+
+
+@router.get("/leaderboard", response_model=schemas.UserLeaderboardPage)
+async def get_leaderboard(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of the global leaderboard; pass next_cursor from the previous page to continue"""
+    try:
+        return await db.run_sync(crud.get_leaderboard_page, max(1, min(limit, 100)), cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/users/{user_id}/rank", response_model=schemas.UserRankResponse)
+async def get_user_rank(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a user's rank on the global leaderboard"""
+    rank = await db.run_sync(crud.get_user_rank, user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rank
+
+
+@router.get("/me", response_model=schemas.UserResponse)
+async def get_current_user_info(current_user: User = Depends(auth.get_current_user_async)):
+    return current_user
@@ -1,26 +1,153 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from database import get_db, User
-import schemas
+from database import get_async_db, User, UserTokenVersion
+from dependencies import get_write_db
+from passwords import get_pwd_context, password_pool
 
 # JWT Configuration
 SECRET_KEY = "your-secret-key-here"  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# "db" loads the user row on every request; "stateless" trusts the signed id/role
+# claims and checks the token version against a short-lived cache of user records
+AUTH_MODE = os.getenv("AUTH_MODE", "db")
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # 0 disables the decoded-token cache
+
 security = HTTPBearer()
 
+class CachedUser:
+    """Detached snapshot of a user row with the same attributes as User"""
+
+    def __init__(self, record: dict):
+        self.__dict__.update(record)
+
+def load_user_record(db: Session, user_id: int) -> Optional[dict]:
+    row = db.query(
+        User.id, User.username, User.email, User.total_score, User.role, User.created_at,
+        func.coalesce(UserTokenVersion.version, 0).label("token_version")
+    ).outerjoin(
+        UserTokenVersion, UserTokenVersion.user_id == User.id
+    ).filter(User.id == user_id).first()
+    return dict(row._mapping) if row else None
+
+class UserCache:
+    """Per-process LRU of user records that expire after ttl_seconds
+
+    Revocations and role changes made by this process evict the entry at once;
+    other workers pick them up when their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (expires_at, record)
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] >= time.time():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        record = load_user_record(db, user_id)
+        if record is None:
+            return None
+        with self._lock:
+            self._entries[user_id] = (time.time() + self.ttl_seconds, record)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return record
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "mode": AUTH_MODE,
+            "ttl_seconds": self.ttl_seconds,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+user_cache = UserCache(ttl_seconds=AUTH_USER_CACHE_TTL_SECONDS, max_entries=AUTH_USER_CACHE_SIZE)
+
+class TokenCache:
+    """Per-process LRU of verified token claims, keyed by the token's SHA-256 digest
+
+    An entry is served until the token's own exp, so a cached token never
+    outlives its validity. Only successfully verified tokens are stored.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # digest -> (exp, claims)
+        self._lock = threading.Lock()
+
+    def decode(self, token: str) -> Optional[dict]:
+        """Verified claims of token, or None if it is malformed, forged or expired"""
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[digest]
+        self.misses += 1
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        if self.max_entries > 0 and "exp" in claims:
+            with self._lock:
+                self._entries[digest] = (claims["exp"], claims)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return claims
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+token_cache = TokenCache(max_entries=TOKEN_CACHE_SIZE)
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -32,6 +159,50 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def get_token_version(db: Session, user_id: int) -> int:
+    return db.query(UserTokenVersion.version).filter(UserTokenVersion.user_id == user_id).scalar() or 0
+
+def create_user_access_token(db: Session, user: User, expires_delta: Optional[timedelta] = None):
+    """Access token carrying the user's id, role and current token version"""
+    return create_access_token(
+        data={"sub": user.username, "uid": user.id, "role": user.role, "ver": get_token_version(db, user.id)},
+        expires_delta=expires_delta
+    )
+
+def bump_token_version(db: Session, user_id: int):
+    """Invalidate every token issued to the user so far (in the caller's transaction)"""
+    token_version = db.get(UserTokenVersion, user_id)
+    if token_version is None:
+        db.add(UserTokenVersion(user_id=user_id, version=1))
+    else:
+        token_version.version += 1
+
+def revoke_user_tokens(db: Session, user_id: int):
+    bump_token_version(db, user_id)
+    db.commit()
+    user_cache.invalidate(user_id)
+
+def resolve_token_user(db: Session, token: str):
+    """Return the user a token belongs to, or None if it is invalid, expired or revoked"""
+    payload = token_cache.decode(token)
+    if payload is None:
+        return None
+    username = payload.get("sub")
+    if username is None:
+        return None
+    version = payload.get("ver", 0)
+    if AUTH_MODE == "stateless" and "uid" in payload:
+        record = user_cache.get(db, payload["uid"])
+        if record is None or record["username"] != username or record["token_version"] != version:
+            return None
+        return CachedUser(record)
+    row = db.query(User, func.coalesce(UserTokenVersion.version, 0)).outerjoin(
+        UserTokenVersion, UserTokenVersion.user_id == User.id
+    ).filter(User.username == username).first()
+    if row is None or row[1] != version:
+        return None
+    return row[0]
+
 def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
     if not user:
@@ -40,40 +211,47 @@ def authenticate_user(db: Session, username: str, password: str):
         return False
     return user
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """authenticate_user with bcrypt on the password pool; upgrades hashes made with an outdated cost"""
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.username == username).first())
+    if not user:
+        return False
+    verified, new_hash = await password_pool.verify_and_update(password, user.password)
+    if not verified:
+        return False
+    if new_hash:
+        user.password = new_hash
+        await run_in_threadpool(db.commit)
+    return user
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_write_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(username=username)
-    except JWTError:
+    user = resolve_token_user(db, credentials.credentials)
+    if user is None:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+    return user
+
+async def get_current_user_async(credentials: HTTPAuthorizationCredentials = Depends(security), db = Depends(get_async_db)):
+    """Async variant of get_current_user for endpoints served from the async engine"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    user = await db.run_sync(resolve_token_user, credentials.credentials)
     if user is None:
         raise credentials_exception
     return user
 
-def get_current_user_optional(db: Session = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
+def get_current_user_optional(db: Session = Depends(get_write_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
     """Optional authentication - returns None if no token provided"""
     if not credentials:
         return None
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        user = db.query(User).filter(User.username == username).first()
-        return user
-    except JWTError:
-        return None
+    return resolve_token_user(db, credentials.credentials)
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
     return current_user
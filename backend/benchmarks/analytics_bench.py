@@ -0,0 +1,97 @@
+"""Benchmark item statistics the way GET /admin/analytics/questions computes them.
+
+By default this times get_item_statistics against the database from
+DATABASE_URL (fill it with benchmarks.generate_data first), bypassing the
+payload cache and reporting the answer fetch and the numpy computation
+separately. With --synthetic only the computation is timed, on random
+arrays of --answers answers.
+
+Usage (from the backend directory):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.analytics_bench
+    python -m benchmarks.analytics_bench --synthetic --answers 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics import compute_item_statistics
+
+
+def synthetic_answers(n_answers: int, n_questions: int, n_users: int, choices_per_question: int = 4, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    question_ids = rng.integers(1, n_questions + 1, n_answers)
+    choice_offsets = rng.integers(0, choices_per_question, n_answers)
+    choice_ids = (question_ids - 1) * choices_per_question + choice_offsets + 1
+    ability = rng.normal(0.0, 1.0, n_users)
+    user_ids = rng.integers(0, n_users, n_answers)
+    difficulty = rng.normal(0.0, 1.0, n_questions + 1)
+    p_correct = 1.0 / (1.0 + np.exp(-(ability[user_ids] - difficulty[question_ids])))
+    is_correct = (rng.random(n_answers) < p_correct).astype(np.float64)
+    total_scores = np.bincount(user_ids, weights=is_correct * 10.0, minlength=n_users)[user_ids]
+    return question_ids, choice_ids, is_correct, total_scores
+
+
+def summarize(label: str, timings: list):
+    print(f"{label:<10} best={min(timings) * 1000:.1f} ms median={sorted(timings)[len(timings) // 2] * 1000:.1f} ms")
+
+
+def bench_synthetic(args):
+    arrays = synthetic_answers(args.answers, args.questions, args.users)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        items = compute_item_statistics(*arrays)
+        timings.append(time.perf_counter() - start)
+    print(f"synthetic answers={args.answers} questions={len(items)} repeat={args.repeat}")
+    summarize("compute", timings)
+
+
+def bench_database(args):
+    import analytics
+    from cache import payload_cache, ANALYTICS_NAMESPACE
+    from database import SessionLocal, engine
+
+    fetch, compute, total = [], [], []
+    db = SessionLocal()
+    try:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            arrays = analytics.load_answer_arrays(db)
+            fetched = time.perf_counter()
+            compute_item_statistics(*arrays)
+            fetch.append(fetched - start)
+            compute.append(time.perf_counter() - fetched)
+            db.rollback()
+
+            # The endpoint path end to end, with the cached result dropped first
+            payload_cache.invalidate(ANALYTICS_NAMESPACE)
+            start = time.perf_counter()
+            items = analytics.get_item_statistics(db)
+            total.append(time.perf_counter() - start)
+            db.rollback()
+    finally:
+        db.close()
+    print(f"{engine.url} answers={len(arrays[0])} questions={len(items)} repeat={args.repeat}")
+    summarize("fetch", fetch)
+    summarize("compute", compute)
+    summarize("endpoint", total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", action="store_true", help="Time only the computation, on random arrays")
+    parser.add_argument("--answers", type=int, default=1_000_000, help="Synthetic answers")
+    parser.add_argument("--questions", type=int, default=10_000, help="Synthetic questions")
+    parser.add_argument("--users", type=int, default=100_000, help="Synthetic users")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        bench_synthetic(args)
+    else:
+        bench_database(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark answer submission (POST /answers) throughput under different logging setups.
+
+Every preset runs in a fresh process against its own temporary SQLite
+database, because the logging configuration is read at import time. Log
+output goes to a temporary file, as it would to a log file or journald
+in production, rather than to the terminal.
+
+Usage (from the backend directory):
+    python -m benchmarks.answer_bench --answers 2000 --presets default debug-sampled debug-sync
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESETS = {
+    # INFO level with the queue handler: the per-step answer lines are DEBUG and cost nothing
+    "default": {},
+    # DEBUG enabled for crud and main, 1% of requests keep their DEBUG lines
+    "debug-sampled": {"LOG_LEVELS": "crud=DEBUG,main=DEBUG"},
+    # Every DEBUG line formatted and written on the request thread
+    "debug-sync": {"LOG_LEVELS": "crud=DEBUG,main=DEBUG", "LOG_DEBUG_SAMPLE_RATE": "1", "LOG_QUEUE": "0"},
+}
+
+
+def run_benchmark(n_answers: int, n_users: int, n_questions: int) -> dict:
+    """Seed users and questions into a migrated database, then submit n_answers answers through the app in this process"""
+    import logging
+
+    from fastapi.testclient import TestClient
+
+    import crud
+    import database
+    import main
+    import schemas
+    from passwords import hash_password
+
+    # The test client's own per-request INFO line is not part of the app's cost
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    db = database.SessionLocal()
+    hashed = hash_password("bench")
+    for i in range(n_users):
+        crud.create_user(db, schemas.UserCreate(username=f"bench{i}", email=f"bench{i}@example.com", password="bench"), hashed_password=hashed)
+    questions = []
+    for i in range(n_questions):
+        question = crud.create_question(db, schemas.QuestionCreateWithChoices(
+            question_text=f"Question {i}", score=10.0,
+            choices=[schemas.ChoiceCreate(choice_text=f"Choice {j}", is_correct=j == 0) for j in range(4)],
+        ), creator_id=1)
+        questions.append((question.id, [choice.id for choice in question.choices]))
+    db.close()
+
+    latencies = []
+    with TestClient(main.app) as client:
+        headers = []
+        for i in range(n_users):
+            token = client.post("/login", json={"username": f"bench{i}", "password": "bench"}).json()["access_token"]
+            headers.append({"Authorization": f"Bearer {token}"})
+        started = time.perf_counter()
+        for i in range(n_answers):
+            question_id, choice_ids = questions[i % n_questions]
+            request_started = time.perf_counter()
+            response = client.post("/answers", headers=headers[(i // n_questions) % n_users], json={
+                "question_id": question_id, "choice_id": choice_ids[i % len(choice_ids)],
+            })
+            latencies.append(time.perf_counter() - request_started)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "answers": n_answers,
+        "answers_per_second": round(n_answers / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+    }
+
+
+def run_preset(name: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, open(os.path.join(tmp, "app.log"), "w+") as log_file:
+        env = dict(os.environ, **PRESETS[name])
+        env.update({
+            "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            "ASYNC_DATABASE_URL": "",
+            "READ_REPLICA_URLS": "",
+            "PASSWORD_WORKERS": "0",
+            "BCRYPT_ROUNDS": "4",
+        })
+        # Migrations run in their own process: alembic's logging setup would otherwise silence the app loggers
+        subprocess.run([sys.executable, "manage.py", "init-db"], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.answer_bench", "--run",
+             "--answers", str(args.answers), "--users", str(args.users), "--questions", str(args.questions)],
+            cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.PIPE, stderr=log_file, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        log_file.seek(0)
+        result["log_lines"] = sum(1 for _ in log_file)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--presets", nargs="+", choices=sorted(PRESETS), default=list(PRESETS))
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_benchmark(args.answers, args.users, args.questions)))
+        return
+
+    for name in args.presets:
+        result = run_preset(name, args)
+        print(
+            f"{name:>14}: {result['answers_per_second']:8.1f} answers/s   p50 {result['p50_ms']:6.2f} ms   "
+            f"p99 {result['p99_ms']:6.2f} ms   {result['log_lines']} log lines"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Drive the real API endpoints and report latency and throughput per endpoint.
+
+By default requests go in-process through the ASGI app, using the database
+from DATABASE_URL. With --url they go to a running server instead. Either
+way the data should come from benchmarks.generate_data: the harness logs
+in as its users (user2, user3, ... with --password) and reads quiz ids
+and choices through the API.
+
+Every endpoint gets the same number of requests, spread over --concurrency
+threads. Each thread has its own seeded random generator, so the same
+arguments send the same requests. Results can be saved as a JSON baseline
+and compared against one.
+
+Usage (from the backend directory):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.api_bench --requests 500 --concurrency 4 --save benchmarks/baselines/local.json
+    python -m benchmarks.api_bench --url http://localhost:8000 --compare benchmarks/baselines/local.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BenchContext:
+    """Tokens and ids collected through the API before measuring"""
+
+    def __init__(self):
+        self.usernames = []
+        self.headers = []
+        self.quiz_ids = []
+        self.questions = []  # (question_id, [choice_id, ...])
+
+
+def login(client, ctx, rng, password):
+    return client.post("/login", json={"username": rng.choice(ctx.usernames), "password": password})
+
+
+def quiz_list(client, ctx, rng, password):
+    return client.get("/quizzes", params={"skip": 0, "limit": 100})
+
+
+def quiz_detail(client, ctx, rng, password):
+    return client.get(f"/quizzes/{rng.choice(ctx.quiz_ids)}")
+
+
+def answer_submit(client, ctx, rng, password):
+    question_id, choice_ids = rng.choice(ctx.questions)
+    return client.post("/answers", headers=rng.choice(ctx.headers), json={
+        "question_id": question_id, "choice_id": rng.choice(choice_ids),
+    })
+
+
+def leaderboard(client, ctx, rng, password):
+    return client.get("/leaderboard", params={"limit": 50})
+
+
+def quiz_leaderboard(client, ctx, rng, password):
+    return client.get(f"/quiz-scores/{rng.choice(ctx.quiz_ids)}/top", params={"limit": 50})
+
+
+ENDPOINTS = {
+    "quiz_list": quiz_list,
+    "quiz_detail": quiz_detail,
+    "leaderboard": leaderboard,
+    "quiz_leaderboard": quiz_leaderboard,
+    "answer_submit": answer_submit,
+    "login": login,
+}
+
+
+def prepare(client, args) -> BenchContext:
+    """Log in a sample of users and collect quiz ids and answerable questions"""
+    rng = random.Random(args.seed)
+    ctx = BenchContext()
+    for user_id in rng.sample(range(2, args.max_user_id + 1), args.users):
+        username = f"user{user_id}"
+        response = client.post("/login", json={"username": username, "password": args.password})
+        if response.status_code != 200:
+            sys.exit(f"Login as {username} failed ({response.status_code}); was the data made by benchmarks.generate_data?")
+        ctx.usernames.append(username)
+        ctx.headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    ctx.quiz_ids = [quiz["id"] for quiz in client.get("/quizzes", params={"skip": 0, "limit": 100}).json()]
+    if not ctx.quiz_ids:
+        sys.exit("No quizzes found")
+    for quiz_id in ctx.quiz_ids[:20]:
+        for question in client.get(f"/quizzes/{quiz_id}").json()["questions"]:
+            ctx.questions.append((question["id"], [choice["id"] for choice in question["choices"]]))
+    return ctx
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_endpoint(client_factory, name, ctx, args) -> dict:
+    """Send args.requests requests to one endpoint from args.concurrency threads"""
+    func = ENDPOINTS[name]
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [args.requests // args.concurrency + (i < args.requests % args.concurrency) for i in range(args.concurrency)]
+
+    def worker(index: int, count: int):
+        rng = random.Random(f"{args.seed}:{name}:{index}")
+        client = client_factory()
+        for _ in range(args.warmup):
+            func(client, ctx, rng, args.password)
+        barrier.wait()
+        local_latencies = []
+        local_errors = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = func(client, ctx, rng, args.password)
+            local_latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                local_errors.append(response.status_code)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+        if args.url:
+            client.close()
+
+    barrier = threading.Barrier(args.concurrency + 1)
+    threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_thread)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_statuses": sorted(set(errors)),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict, baseline: dict = None):
+    print(f"{'endpoint':<18}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, result in results.items():
+        line = (
+            f"{name:<18}{result['requests']:>9}{result['errors']:>8}{result['throughput_rps']:>10.1f}"
+            f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for key, label in (("throughput_rps", "req/s"), ("p50_ms", "p50"), ("p99_ms", "p99")):
+                if previous[key]:
+                    deltas.append(f"{label} {(result[key] - previous[key]) * 100 / previous[key]:+.1f}%")
+            line += "   vs baseline: " + ", ".join(deltas)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per thread before measuring")
+    parser.add_argument("--users", type=int, default=20, help="Generated users to log in as")
+    parser.add_argument("--max-user-id", type=int, default=1000, help="Pick users among user2..userN")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON baseline to compare against")
+    args = parser.parse_args()
+
+    if args.url:
+        import httpx
+
+        def client_factory():
+            return httpx.Client(base_url=args.url, timeout=60)
+
+        shared = None
+        setup_client = client_factory()
+    else:
+        from fastapi.testclient import TestClient
+
+        import main as app_main
+
+        # main sets up INFO logging; the test client's own per-request INFO line is not part of the app's cost
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        # One client (and event loop) shared by all threads, like a single server worker
+        shared = TestClient(app_main.app)
+        shared.__enter__()
+        setup_client = shared
+
+        def client_factory():
+            return shared
+
+    try:
+        ctx = prepare(setup_client, args)
+        results = {name: run_endpoint(client_factory, name, ctx, args) for name in args.endpoints}
+    finally:
+        if shared is not None:
+            shared.__exit__(None, None, None)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    "commit": git_commit(),
+                    "target": args.url or "in-process",
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "seed": args.seed,
+                    "python": platform.python_version(),
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Fill an empty database with a large synthetic dataset for load testing.
+
+Rows are written with executemany batches on the engine from DATABASE_URL,
+so production-sized data (100k users, millions of answers) loads in
+minutes. Every user shares one password, hashed once. User 1 is an admin
+named "bench_admin" and the others are user2, user3 and so on. Total
+scores, quiz scores and the dashboard counters are consistent with the
+generated answers. The same --seed always produces the same data.
+
+Usage (from the backend directory):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.generate_data --users 100000 --answers 2000000
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from database import Answer, Choice, Question, Quiz, QuizQuestion, QuizScore, User, engine
+
+CATEGORIES = ["science", "history", "geography", "math", "literature", "sports", "technology", "art"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+QUESTION_SCORES = [5.0, 10.0, 15.0, 20.0]
+CHOICES_PER_QUESTION = 4
+
+
+class BulkWriter:
+    """Buffers rows per table and writes them with one executemany per batch"""
+
+    def __init__(self, connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        # Insertion order matters for foreign keys: parents are flushed before children
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row: dict):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model, rows in self.buffers.items():
+            if rows:
+                self.connection.execute(insert(model.__table__), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                rows.clear()
+
+
+def generate(args):
+    from passwords import hash_password
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    password_hash = hash_password(args.password)
+
+    def timestamp():
+        return now - timedelta(seconds=rng.randrange(args.days * 86400))
+
+    # Question content: score, correct choice and a difficulty used to decide who answers correctly
+    question_scores = [rng.choice(QUESTION_SCORES) for _ in range(args.questions)]
+    correct_offsets = [rng.randrange(CHOICES_PER_QUESTION) for _ in range(args.questions)]
+    difficulty = [rng.gauss(0.0, 1.0) for _ in range(args.questions)]
+    quiz_questions = [
+        rng.sample(range(1, args.questions + 1), args.questions_per_quiz) for _ in range(args.quizzes)
+    ]
+
+    def choice_id(question_id: int, offset: int) -> int:
+        return (question_id - 1) * CHOICES_PER_QUESTION + offset + 1
+
+    def answer(user_id: int, ability: float, question_id: int, created_at: datetime):
+        """Pick a choice (correct with a logistic probability), return (row, score, is_correct)"""
+        p_correct = 1.0 / (1.0 + math.exp(difficulty[question_id - 1] - ability))
+        correct_offset = correct_offsets[question_id - 1]
+        if rng.random() < p_correct:
+            offset = correct_offset
+        else:
+            offset = (correct_offset + rng.randrange(1, CHOICES_PER_QUESTION)) % CHOICES_PER_QUESTION
+        is_correct = offset == correct_offset
+        score = question_scores[question_id - 1] if is_correct else 0.0
+        row = {
+            "user_id": user_id, "question_id": question_id, "choice_id": choice_id(question_id, offset),
+            "score": score, "is_correct": is_correct, "created_at": created_at,
+        }
+        return row, score, is_correct
+
+    with engine.begin() as connection:
+        writer = BulkWriter(connection, args.batch_size)
+        started = time.perf_counter()
+
+        # The admin first: it is the creator of every question and quiz
+        writer.add(User, {
+            "id": 1, "username": "bench_admin", "email": "bench_admin@example.com", "password": password_hash,
+            "role": "admin", "total_score": 0.0, "created_at": now,
+        })
+        writer.flush()
+        for question_id in range(1, args.questions + 1):
+            writer.add(Question, {
+                "id": question_id, "question_text": f"Synthetic question {question_id}",
+                "score": question_scores[question_id - 1], "creator_id": 1, "created_at": timestamp(),
+            })
+        writer.flush()
+        for question_id in range(1, args.questions + 1):
+            for offset in range(CHOICES_PER_QUESTION):
+                writer.add(Choice, {
+                    "id": choice_id(question_id, offset), "question_id": question_id,
+                    "choice_text": f"Choice {offset + 1} of question {question_id}",
+                    "is_correct": offset == correct_offsets[question_id - 1],
+                })
+        for quiz_id in range(1, args.quizzes + 1):
+            writer.add(Quiz, {
+                "id": quiz_id, "title": f"Synthetic quiz {quiz_id}", "description": "Generated for load testing",
+                "category": rng.choice(CATEGORIES), "difficulty": rng.choice(DIFFICULTIES),
+                "time_limit": rng.choice([5, 10, 15, 30]), "creator_id": 1, "created_at": timestamp(),
+            })
+        writer.flush()
+        for quiz_id, question_ids in enumerate(quiz_questions, start=1):
+            for question_id in question_ids:
+                writer.add(QuizQuestion, {"quiz_id": quiz_id, "question_id": question_id})
+        writer.flush()
+        print(f"questions, choices and quizzes written in {time.perf_counter() - started:.1f}s")
+
+        # Users with their quiz attempts (answers to every question of the quiz plus a quiz
+        # score) and standalone answers, so each user's rows are generated in one place
+        attempts_per_user = args.quiz_scores / max(1, args.users - 1)
+        answers_per_user = args.answers / max(1, args.users - 1)
+        for user_id in range(2, args.users + 1):
+            ability = rng.gauss(0.0, 1.0)
+            total_score = 0.0
+            answered = set()
+            user_answers = []
+
+            n_attempts = int(attempts_per_user) + (rng.random() < attempts_per_user % 1)
+            for quiz_id in rng.sample(range(1, args.quizzes + 1), min(n_attempts, args.quizzes)):
+                completed_at = timestamp()
+                attempt_score = 0.0
+                correct_answers = 0
+                question_ids = [question_id for question_id in quiz_questions[quiz_id - 1] if question_id not in answered]
+                for question_id in question_ids:
+                    row, score, is_correct = answer(user_id, ability, question_id, completed_at)
+                    user_answers.append(row)
+                    answered.add(question_id)
+                    attempt_score += score
+                    correct_answers += is_correct
+                    total_score += score
+                total_score += attempt_score
+                writer.add(QuizScore, {
+                    "user_id": user_id, "quiz_id": quiz_id, "score": attempt_score,
+                    "total_questions": len(question_ids), "correct_answers": correct_answers,
+                    "completed_at": completed_at,
+                })
+
+            n_answers = int(answers_per_user) + (rng.random() < answers_per_user % 1)
+            for _ in range(max(0, min(n_answers, args.questions) - len(answered))):
+                question_id = rng.randrange(1, args.questions + 1)
+                while question_id in answered:
+                    question_id = rng.randrange(1, args.questions + 1)
+                answered.add(question_id)
+                row, score, _ = answer(user_id, ability, question_id, timestamp())
+                user_answers.append(row)
+                total_score += score
+
+            # Added before the user's answers and quiz scores, and flush() writes users first
+            writer.add(User, {
+                "id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com",
+                "password": password_hash, "role": "user", "total_score": total_score, "created_at": timestamp(),
+            })
+            for row in user_answers:
+                writer.add(Answer, row)
+            if user_id % 10000 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"  {user_id} users, {writer.counts.get('answers', 0)} answers ({elapsed:.1f}s)")
+        writer.flush()
+
+        if connection.dialect.name == "postgresql":
+            # Explicit ids do not advance the serial sequences
+            for model in (User, Question, Choice, Quiz, Answer, QuizScore):
+                table = model.__tablename__
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+                ))
+
+    return writer.counts, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--questions", type=int, default=10_000)
+    parser.add_argument("--quizzes", type=int, default=1_000)
+    parser.add_argument("--questions-per-quiz", type=int, default=10)
+    parser.add_argument("--answers", type=int, default=2_000_000, help="Approximate total answers, quiz attempts included")
+    parser.add_argument("--quiz-scores", type=int, default=200_000, help="Approximate number of completed quiz attempts")
+    parser.add_argument("--days", type=int, default=90, help="Spread timestamps over this many past days")
+    parser.add_argument("--password", default="bench", help="Password of every generated user")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import manage
+    import stats
+    from database import SessionLocal
+
+    manage.run_migrations()
+    with engine.connect() as connection:
+        if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+            sys.exit(f"{engine.url} already has users; generate into an empty database")
+
+    counts, elapsed = generate(args)
+    db = SessionLocal()
+    try:
+        stats.reconcile(db)
+    finally:
+        db.close()
+    rows = sum(counts.values())
+    print(", ".join(f"{table}={count}" for table, count in counts.items()))
+    print(f"{rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s); log in as bench_admin or userN with password {args.password!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark how long a fresh worker process takes to become ready to serve.
+
+Each run starts a new interpreter that imports main and runs the startup
+handlers, the same work a uvicorn/gunicorn worker does before it accepts
+connections.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup_bench --runs 10 --imports 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+asyncio.run(main.app.router.startup())
+started = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "startup_ms": (started - imported) * 1000}))
+asyncio.run(main.app.router.shutdown())
+"""
+
+
+def run_once():
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def slowest_imports(count: int):
+    """Top-level modules imported by main, by cumulative import time (python -X importtime)"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR, check=True,
+        capture_output=True, text=True
+    ).stderr
+    # Children are printed before their parent, one level deeper; main's direct imports
+    # are the depth-1 lines between the previous top-level import and main itself
+    modules = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name == "main":
+                break
+            modules = []
+        elif depth == 1:
+            modules.append((int(parts[1]) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", type=int, default=0, help="Also list the N slowest modules main imports")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    for key in ("import_ms", "startup_ms", "process_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key:>10}: median {statistics.median(values):7.1f} ms   max {max(values):7.1f} ms")
+
+    if args.imports:
+        print("\nSlowest imports of main (cumulative):")
+        for elapsed_ms, name in slowest_imports(args.imports):
+            print(f"{elapsed_ms:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
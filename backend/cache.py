@@ -0,0 +1,343 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+# Cache Configuration
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# "sqlite" shares one cache file between all workers on the node; "memory" is for single-process servers only
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "./quizki-cache.db")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def serialize(payload: Any) -> bytes:
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def deserialize(data: bytes) -> Any:
+    return json.loads(data)
+
+
+class CacheBackend:
+    """Storage for serialized payloads plus named generation counters"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, ttl_seconds: float):
+        raise NotImplementedError
+
+    def get_generation(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def bump_generation(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU store bounded by total size in bytes"""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, data)
+        self._generations = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes, ttl_seconds: float):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl_seconds, data)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace: str) -> int:
+        with self._lock:
+            generation = self._generations.get(namespace, 0) + 1
+            self._generations[namespace] = generation
+            return generation
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str):
+        _, data = self._entries.pop(key)
+        self._size -= len(data)
+
+
+class SQLiteBackend(CacheBackend):
+    """On-disk store shared by every worker process on the node
+
+    Entries are evicted oldest-first once the total size exceeds max_bytes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_generations (namespace TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, data: bytes, ttl_seconds: float):
+        if len(data) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now + ttl_seconds),
+            )
+            conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            while total > self.max_bytes:
+                oldest = conn.execute("SELECT key, size FROM cache_entries ORDER BY stored_at LIMIT 1").fetchone()
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (oldest[0],))
+                total -= oldest[1]
+                self.evictions += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_generation(self, namespace: str) -> int:
+        row = self._connection().execute(
+            "SELECT value FROM cache_generations WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self, namespace: str) -> int:
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO cache_generations (namespace, value) VALUES (?, 1) "
+            "ON CONFLICT(namespace) DO UPDATE SET value = value + 1",
+            (namespace,),
+        )
+        return self.get_generation(namespace)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entries")
+
+    def stats(self) -> dict:
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "evictions": self.evictions,
+            "path": self.path,
+        }
+
+
+class PayloadCache:
+    """Read-through cache of JSON-serialized payloads
+
+    Keys live in namespaces. Invalidating a namespace bumps its generation
+    counter in the backend, so every worker sharing the backend stops
+    reading the old entries at once; they then age out through TTL/eviction.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        # Set when reads may come from lagging replicas (see database.py)
+        self.replica_lag_seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _versioned_key(self, namespace: str, key: str) -> str:
+        return f"{namespace}@{self.backend.get_generation(namespace)}:{key}"
+
+    def get_or_load(self, namespace: str, key: str, loader: Callable[[], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """Return the cached payload, calling loader on a miss (None results are not cached)
+
+        The payload is always returned in its serialized-and-decoded form so
+        hits and misses look the same to callers.
+        """
+        if not self.enabled:
+            payload = loader()
+            return None if payload is None else deserialize(serialize(payload))
+
+        versioned_key = self._versioned_key(namespace, key)
+        data = self.backend.get(versioned_key)
+        if data is not None:
+            self.hits += 1
+            return deserialize(data)
+
+        self.misses += 1
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        lag_window = self.lag_window(namespace)
+        payload = loader()
+        if payload is None:
+            return None
+        data = serialize(payload)
+        self.backend.set(versioned_key, data, min(ttl_seconds, lag_window) if lag_window else ttl_seconds)
+        return deserialize(data)
+
+    def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            self.backend.bump_generation(namespace)
+            self.mark_written(namespace)
+
+    def mark_written(self, namespace: str):
+        """Note a write to the namespace, so loads during the replica lag window are cached only until it ends"""
+        if self.replica_lag_seconds > 0:
+            refresh_mark(self.backend, f"written:{namespace}", self.replica_lag_seconds)
+
+    def lag_window(self, namespace: str) -> float:
+        """Seconds until replicas are assumed to have the namespace's last write, 0 if they already have it"""
+        if self.replica_lag_seconds <= 0:
+            return 0.0
+        return mark_remaining(self.backend, f"written:{namespace}", self.replica_lag_seconds)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "max_bytes": self.backend.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+def refresh_mark(backend: CacheBackend, key: str, window_seconds: float):
+    """Record that something happened now, for at least window_seconds
+
+    The mark lasts 1.5 windows and is rewritten only once it is half a window
+    old, so frequent events cost a read instead of a write to the backend.
+    """
+    now = time.time()
+    marked_at = backend.get(key)
+    if marked_at is not None and now - float(marked_at) < window_seconds / 2:
+        return
+    backend.set(key, str(now).encode("utf-8"), window_seconds * 1.5)
+
+
+def mark_remaining(backend: CacheBackend, key: str, window_seconds: float) -> float:
+    """Seconds left until window_seconds have passed since the latest event recorded by refresh_mark"""
+    marked_at = backend.get(key)
+    if marked_at is None:
+        return 0.0
+    return max(0.0, float(marked_at) + window_seconds * 1.5 - time.time())
+
+
+def create_backend(kind: str = CACHE_BACKEND) -> CacheBackend:
+    if kind == "memory":
+        # Generations are per process: other workers would never see this one's invalidations
+        return MemoryBackend(max_bytes=CACHE_MAX_BYTES)
+    if kind == "sqlite":
+        return SQLiteBackend(path=CACHE_SQLITE_PATH, max_bytes=CACHE_MAX_BYTES)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# Shared cache for quiz and leaderboard read paths
+payload_cache = PayloadCache(backend=create_backend(), ttl_seconds=CACHE_TTL_SECONDS, enabled=CACHE_ENABLED)
+
+
+# Namespaces
+QUIZ_LIST_NAMESPACE = "quizzes"
+USER_LEADERBOARD_NAMESPACE = "leaderboard:users"
+ANALYTICS_NAMESPACE = "analytics"
+
+
+def quiz_namespace(quiz_id: int) -> str:
+    return f"quiz:{quiz_id}"
+
+
+def question_namespace(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+def quiz_leaderboard_namespace(quiz_id: int) -> str:
+    return f"leaderboard:quiz:{quiz_id}"
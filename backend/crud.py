@@ -1,13 +1,39 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+from typing import List, Optional
 from database import User, Question, Choice, Answer, Quiz, QuizQuestion, QuizScore
+import auth
 from auth import get_password_hash
+from cache import payload_cache, quiz_namespace, question_namespace, quiz_leaderboard_namespace, QUIZ_LIST_NAMESPACE, USER_LEADERBOARD_NAMESPACE
 import schemas
+import leaderboard
+import grading
+import stats
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Writes that still hit the unique answer index after locking the user are retried this many times in total
+ANSWER_WRITE_ATTEMPTS = 3
+
+class AnswerWriteConflict(Exception):
+    """Raised when an answer write keeps conflicting with concurrent writes of the same user"""
+
+def _lock_user(db: Session, user_id: int):
+    """Open the write transaction on the user's row so that their answer writes run one at a time
+
+    The no-op UPDATE holds the row lock on PostgreSQL and the database write
+    lock on SQLite until commit, so every read after it sees the user's
+    earlier writes. Returns the user reloaded inside the transaction.
+    """
+    db.execute(
+        update(User).where(User.id == user_id).values(total_score=User.total_score)
+        .execution_options(synchronize_session=False)
+    )
+    return db.get(User, user_id, populate_existing=True)
+
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
@@ -18,10 +44,85 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).order_by(desc(User.total_score)).offset(skip).limit(limit).all()
+    """Get a page of the global leaderboard, served from the cache when possible"""
+    return payload_cache.get_or_load(
+        USER_LEADERBOARD_NAMESPACE, f"{skip}:{limit}",
+        lambda: [user_to_dict(user) for user in db.query(User).order_by(desc(User.total_score), desc(User.id)).offset(skip).limit(limit).all()]
+    )
+
+def parse_leaderboard_cursor(cursor: str):
+    """Parse a "<total_score>:<user_id>" keyset cursor, raising ValueError if malformed"""
+    score, user_id = cursor.split(":")
+    return float(score), int(user_id)
+
+def get_leaderboard_page(db: Session, limit: int = 20, cursor: Optional[str] = None):
+    """Get a page of the global leaderboard using keyset pagination on (total_score, id)
+
+    The cursor is the last entry of the previous page, so deep pages cost the
+    same as the first one instead of scanning all skipped rows.
+    """
+    def load():
+        query = db.query(User.id, User.username, User.total_score)
+        if cursor:
+            score, user_id = parse_leaderboard_cursor(cursor)
+            query = query.filter(tuple_(User.total_score, User.id) < tuple_(score, user_id))
+        rows = query.order_by(desc(User.total_score), desc(User.id)).limit(limit).all()
+        
+        entries = []
+        if rows:
+            # Global position of the first row: everyone with a higher score, plus
+            # the users tied with it that were already listed on earlier pages
+            first = rows[0]
+            above = count_users_above(db, first.total_score)
+            tied_before = db.query(func.count(User.id)).filter(
+                User.total_score == first.total_score, User.id > first.id
+            ).scalar()
+            position = above + tied_before
+            for index, row in enumerate(rows):
+                if index == 0:
+                    rank = above + 1
+                elif row.total_score == rows[index - 1].total_score:
+                    rank = entries[-1]["rank"]
+                else:
+                    rank = position + index + 1
+                entries.append({"rank": rank, "username": row.username, "total_score": row.total_score})
+        
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = f"{rows[-1].total_score}:{rows[-1].id}"
+        return {"entries": entries, "next_cursor": next_cursor}
+    
+    return payload_cache.get_or_load(USER_LEADERBOARD_NAMESPACE, f"keyset:{cursor}:{limit}", load)
+
+def count_users_above(db: Session, total_score: float):
+    """Count users with a strictly higher total score (a range scan on the score index)"""
+    return db.query(func.count(User.id)).filter(User.total_score > total_score).scalar()
+
+def get_user_rank(db: Session, user_id: int):
+    """Get a user's position on the global leaderboard, or None if the user does not exist"""
+    user = db.query(User.id, User.username, User.total_score).filter(User.id == user_id).first()
+    if not user:
+        return None
+    return {
+        "user_id": user.id,
+        "username": user.username,
+        "total_score": user.total_score,
+        "rank": count_users_above(db, user.total_score) + 1
+    }
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+def user_to_dict(user: User):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "total_score": user.total_score,
+        "role": user.role,
+        "created_at": user.created_at
+    }
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -31,6 +132,20 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+    return db_user
+
+def update_user_role(db: Session, user_id: int, role: str):
+    """Change a user's role and revoke their tokens so the old role stops being honoured"""
+    db_user = get_user(db, user_id)
+    if db_user is None:
+        return None
+    db_user.role = role
+    auth.bump_token_version(db, user_id)
+    db.commit()
+    db.refresh(db_user)
+    auth.user_cache.invalidate(user_id)
+    payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
     return db_user
 
 def get_question(db: Session, question_id: int):
@@ -62,35 +177,95 @@ def create_question(db: Session, question: schemas.QuestionCreateWithChoices, cr
     db.refresh(db_question)
     return db_question
 
-def update_question(db: Session, question_id: int, question: schemas.QuestionCreateWithChoices):
+def update_question(db: Session, question_id: int, question: schemas.QuestionUpdate):
+    """Apply only what changed, keeping the ids of choices that are kept
+
+    A choice is kept when the update names its id or, without an id, repeats
+    its text. Returns (question, changes) or None if the question does not exist;
+    raises ValueError for choice ids of another question and for removing
+    choices that already have answers.
+    """
     db_question = db.query(Question).filter(Question.id == question_id).first()
-    if db_question:
-        db_question.question_text = question.question_text
-        db_question.score = question.score
-        
-        # Delete existing choices
-        db.query(Choice).filter(Choice.question_id == question_id).delete()
-        
-        # Add new choices
-        for choice in question.choices:
-            db_choice = Choice(
-                choice_text=choice.choice_text,
-                is_correct=choice.is_correct,
-                question_id=question_id
-            )
+    if not db_question:
+        return None
+
+    existing = {choice.id: choice for choice in db.query(Choice).filter(Choice.question_id == question_id).order_by(Choice.id)}
+    unknown = [choice.id for choice in question.choices if choice.id is not None and choice.id not in existing]
+    if unknown:
+        raise ValueError(f"Not choices of question {question_id}: {', '.join(map(str, unknown))}")
+    named = [choice.id for choice in question.choices if choice.id is not None]
+    if len(named) != len(set(named)):
+        raise ValueError("Each choice id can only appear once")
+
+    # Pair every submitted choice with the existing choice it replaces, if any
+    unclaimed = [choice for choice_id, choice in existing.items() if choice_id not in named]
+    pairs = []
+    for choice in question.choices:
+        if choice.id is not None:
+            pairs.append((choice, existing[choice.id]))
+            continue
+        match = next((db_choice for db_choice in unclaimed if db_choice.choice_text == choice.choice_text), None)
+        if match is not None:
+            unclaimed.remove(match)
+        pairs.append((choice, match))
+    removed = [db_choice.id for db_choice in unclaimed]
+    if removed:
+        answered = [row.choice_id for row in db.query(Answer.choice_id).filter(Answer.choice_id.in_(removed)).distinct()]
+        if answered:
+            raise ValueError(f"Choices with answers cannot be removed: {', '.join(map(str, sorted(answered)))}")
+
+    changes = {"fields": [], "choices_added": [], "choices_updated": [], "choices_removed": removed}
+    for field in ("question_text", "score"):
+        if getattr(db_question, field) != getattr(question, field):
+            setattr(db_question, field, getattr(question, field))
+            changes["fields"].append(field)
+    # Text changes only affect the quiz payloads; score and correctness also change the answer keys
+    grading_changed = "score" in changes["fields"] or bool(removed)
+    added = []
+    for choice, db_choice in pairs:
+        if db_choice is None:
+            db_choice = Choice(question_id=question_id, choice_text=choice.choice_text, is_correct=choice.is_correct)
             db.add(db_choice)
-        
-        db.commit()
-        db.refresh(db_question)
-    return db_question
+            added.append(db_choice)
+            grading_changed = True
+        elif (db_choice.choice_text, db_choice.is_correct) != (choice.choice_text, choice.is_correct):
+            grading_changed = grading_changed or db_choice.is_correct != choice.is_correct
+            db_choice.choice_text = choice.choice_text
+            db_choice.is_correct = choice.is_correct
+            changes["choices_updated"].append(db_choice.id)
+    if removed:
+        db.query(Choice).filter(Choice.id.in_(removed)).delete(synchronize_session=False)
+        db.expire(db_question, ["choices"])
+
+    if not (changes["fields"] or added or changes["choices_updated"] or removed):
+        return db_question, changes
+    db.commit()
+    changes["choices_added"] = [db_choice.id for db_choice in added]
+    db.refresh(db_question)
+    namespaces = [quiz_namespace(quiz_id) for quiz_id in get_question_quiz_ids(db, question_id)]
+    if grading_changed:
+        namespaces.append(question_namespace(question_id))
+    if namespaces:
+        payload_cache.invalidate(*namespaces)
+    return db_question, changes
 
 def delete_question(db: Session, question_id: int):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
+        quiz_ids = get_question_quiz_ids(db, question_id)
         db.delete(db_question)
         db.commit()
+        payload_cache.invalidate(QUIZ_LIST_NAMESPACE, question_namespace(question_id), *[quiz_namespace(quiz_id) for quiz_id in quiz_ids])
     return db_question
 
+def get_question_quiz_ids(db: Session, question_id: int):
+    """Get IDs of all quizzes that contain a specific question"""
+    return [row.quiz_id for row in db.query(QuizQuestion.quiz_id).filter(QuizQuestion.question_id == question_id).all()]
+
+def invalidate_question_quizzes(db: Session, question_id: int):
+    """Drop cached answer keys and detail payloads of the question and every quiz that embeds it"""
+    payload_cache.invalidate(question_namespace(question_id), *[quiz_namespace(quiz_id) for quiz_id in get_question_quiz_ids(db, question_id)])
+
 def get_choice(db: Session, choice_id: int):
     return db.query(Choice).filter(Choice.id == choice_id).first()
 
@@ -106,126 +281,157 @@ def get_user_answer_for_question(db: Session, user_id: int, question_id: int):
 
 def delete_user_answer(db: Session, user_id: int, question_id: int):
     """Delete user's answer for a specific question (for re-take functionality)"""
+    if not get_user_answer_for_question(db, user_id, question_id):
+        return False
+    
+    # Re-read under the user's lock so a concurrent reset or replacement is not deducted twice
+    user = _lock_user(db, user_id)
     existing_answer = get_user_answer_for_question(db, user_id, question_id)
-    if existing_answer:
-        # Also subtract score from user's total
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            user.total_score = max(0, user.total_score - existing_answer.score)
-            logger.info(f"Deducted {existing_answer.score} points from user {user_id}, new total: {user.total_score}")
-        
-        db.delete(existing_answer)
-        db.commit()
-        return True
-    return False
+    if not existing_answer:
+        db.rollback()
+        return False
+    
+    # Also subtract score from user's total
+    if user:
+        user.total_score = max(0, user.total_score - existing_answer.score)
+    
+    # Decrement with the correctness the counters were incremented with, not the current answer key
+    stats.record_answer_changes(db, [(question_id, existing_answer.created_at, existing_answer.is_correct, -1)])
+    
+    deducted = existing_answer.score
+    db.delete(existing_answer)
+    db.commit()
+    payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+    auth.user_cache.invalidate(user_id)
+    logger.debug("previous answer deleted", extra={"user_id": user_id, "question_id": question_id, "score": deducted})
+    return True
 
 # FIXED: Enhanced the create_answer function to always set is_correct explicitly
 def create_answer(db: Session, user_id: int, question_id: int, choice_id: int):
-    """Create a new answer record - ENHANCED with better validation and logging"""
-    logger.info(f"🔍 CREATE_ANSWER: Starting creation - user_id={user_id}, question_id={question_id}, choice_id={choice_id}")
-    
-    # Get the choice and verify it exists
-    choice = db.query(Choice).filter(Choice.id == choice_id).first()
-    if not choice:
-        logger.error(f"❌ CREATE_ANSWER: Choice {choice_id} not found")
+    """Create the user's answer to a question, replacing any previous answer
+
+    Returns None for an unknown question or choice and raises
+    AnswerWriteConflict if concurrent writes keep winning the unique answer index.
+    """
+    # Grade against the cached answer key instead of loading the choice and question
+    question_key = grading.get_question_key(db, question_id)
+    if not question_key:
+        logger.error("answer rejected: question not found", extra={"user_id": user_id, "question_id": question_id})
         return None
     
-    # Get the question and verify it exists  
-    question = db.query(Question).filter(Question.id == question_id).first()
-    if not question:
-        logger.error(f"❌ CREATE_ANSWER: Question {question_id} not found")
-        return None
-        
-    # Verify choice belongs to question
-    if choice.question_id != question_id:
-        logger.error(f"❌ CREATE_ANSWER: Choice {choice_id} doesn't belong to question {question_id}")
+    try:
+        score, is_correct = question_key.grade(choice_id)
+    except ValueError:
+        logger.error("answer rejected: choice not in question", extra={
+            "user_id": user_id, "question_id": question_id, "choice_id": choice_id
+        })
         return None
     
-    logger.info(f"✅ CREATE_ANSWER: Found choice={choice_id} and question={question_id}")
-    
-    # Calculate score based on is_correct
-    is_correct = choice.is_correct  # Get the actual correctness from database
-    score = question.score if is_correct else 0.0
-    
-    logger.info(f"💰 CREATE_ANSWER: Calculated score={score} (is_correct={is_correct})")
-    
-    # Create answer with explicit field values
-    db_answer = Answer(
-        user_id=user_id,
-        question_id=question_id,
-        choice_id=choice_id,
-        score=score
-    )
-    
-    logger.info(f"📝 CREATE_ANSWER: Created Answer object - user_id={user_id}, question_id={question_id}, choice_id={choice_id}, score={score}")
-    
-    db.add(db_answer)
-    
-    # Update user's total score
-    user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        old_score = user.total_score
-        user.total_score += score
-        logger.info(f"📊 CREATE_ANSWER: Updated user total score from {old_score} to {user.total_score}")
-    
-    try:
-        db.commit()
-        db.refresh(db_answer)
-        
-        logger.info(f"✅ CREATE_ANSWER: COMMITTED - ID={db_answer.id}, user_id={user_id}, question_id={question_id}, choice_id={choice_id}, score={score}")
+    for attempt in range(1, ANSWER_WRITE_ATTEMPTS + 1):
+        try:
+            db_answer, total_score = _write_answer(db, user_id, question_id, choice_id, score, is_correct)
+            db.commit()
+        except IntegrityError as e:
+            # Another writer inserted the answer first; the retry finds it and replaces it
+            db.rollback()
+            logger.warning("answer write conflict", extra={
+                "user_id": user_id, "question_id": question_id, "attempt": attempt, "error": str(e)
+            })
+            continue
+        except Exception as e:
+            logger.error("answer commit failed", extra={"user_id": user_id, "question_id": question_id, "error": str(e)})
+            db.rollback()
+            return None
         
-        # CRITICAL: Explicitly set is_correct on the response object
-        db_answer.is_correct = is_correct
-        logger.info(f"🔍 CREATE_ANSWER: Set is_correct={is_correct} on response")
+        db.refresh(db_answer)
+        payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+        auth.user_cache.invalidate(user_id)
         
+        logger.debug("answer created", extra={
+            "answer_id": db_answer.id, "user_id": user_id, "question_id": question_id, "choice_id": choice_id,
+            "score": score, "is_correct": is_correct, "total_score": total_score
+        })
         return db_answer
-    except Exception as e:
-        logger.error(f"💥 CREATE_ANSWER: Failed to commit: {str(e)}")
-        db.rollback()
-        return None
+    raise AnswerWriteConflict(f"Answer to question {question_id} conflicted with concurrent writes")
 
-# FIXED: Enhanced the get_user_answers function to always include is_correct
-def get_user_answers(db: Session, user_id: int):
-    """Get all answers for a specific user with is_correct information"""
-    logger.info(f"🔍 GET_USER_ANSWERS: Starting fetch for user {user_id}")
-    
-    # Get all answers for this user
-    all_answers = db.query(Answer).filter(Answer.user_id == user_id).all()
-    logger.info(f"📊 GET_USER_ANSWERS: Found {len(all_answers)} total answer records")
-    
-    # Filter out any records with NULL question_id or choice_id
-    valid_records = [a for a in all_answers if a.question_id is not None and a.choice_id is not None]
-    null_records = len(all_answers) - len(valid_records)
-    
-    logger.info(f"📊 GET_USER_ANSWERS: {null_records} NULL records, {len(valid_records)} valid records")
+def _write_answer(db: Session, user_id: int, question_id: int, choice_id: int, score: float, is_correct: bool):
+    """Store the user's graded answer, replacing any previous one in place, without committing"""
+    user = _lock_user(db, user_id)
+    previous = db.query(Answer).filter(Answer.user_id == user_id, Answer.question_id == question_id).first()
+    now = datetime.utcnow()
+    stat_changes = [(question_id, now, is_correct, 1)]
+    if previous:
+        # Decrement with the correctness the counters were incremented with
+        stat_changes.append((question_id, previous.created_at, previous.is_correct, -1))
+        if user:
+            user.total_score = max(0, user.total_score - previous.score)
+        db_answer = previous
+        db_answer.choice_id = choice_id
+        db_answer.score = score
+        db_answer.is_correct = is_correct
+        db_answer.created_at = now
+    else:
+        db_answer = Answer(
+            user_id=user_id,
+            question_id=question_id,
+            choice_id=choice_id,
+            score=score,
+            is_correct=is_correct,
+            created_at=now
+        )
+        db.add(db_answer)
     
-    # Transform to response format with explicit is_correct field
-    result = []
-    for answer in valid_records:
-        # Get the choice to determine correctness
-        choice = db.query(Choice).filter(Choice.id == answer.choice_id).first()
-        is_correct = choice.is_correct if choice else False
-        
-        # Create response object with is_correct explicitly set
-        answer_dict = {
-            "id": answer.id,
-            "user_id": answer.user_id,
-            "question_id": answer.question_id,
-            "choice_id": answer.choice_id,
-            "score": answer.score,
-            "is_correct": is_correct,  # Always include is_correct
-            "created_at": answer.created_at
-        }
-        result.append(answer_dict)
+    total_score = None
+    if user:
+        user.total_score += score
+        # Read before commit, which expires it
+        total_score = user.total_score
     
-    logger.info(f"✅ GET_USER_ANSWERS: Returning {len(result)} valid answers for user {user_id}")
+    stats.record_answer_changes(db, stat_changes)
+    db.flush()
+    return db_answer, total_score
+
+def get_user_answers(db: Session, user_id: int, skip: int = 0, limit: Optional[int] = None, quiz_id: Optional[int] = None):
+    """Get a user's answers with the correctness recorded when each was graded"""
+    query = select(
+        Answer.id, Answer.user_id, Answer.question_id, Answer.choice_id, Answer.score,
+        Answer.is_correct, Answer.created_at
+    ).where(
+        Answer.user_id == user_id,
+        # Skip score-only records, which have no question or choice
+        Answer.question_id.isnot(None),
+        Answer.choice_id.isnot(None)
+    )
+    if quiz_id is not None:
+        query = query.where(Answer.question_id.in_(
+            select(QuizQuestion.question_id).where(QuizQuestion.quiz_id == quiz_id)
+        ))
+    query = query.order_by(Answer.id).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    
+    # Stream rows from the cursor in batches rather than buffering ORM objects
+    rows = db.execute(query.execution_options(yield_per=1000))
+    result = [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "question_id": row.question_id,
+            "choice_id": row.choice_id,
+            "score": row.score,
+            "is_correct": bool(row.is_correct),
+            "created_at": row.created_at
+        } for row in rows
+    ]
+    
+    logger.debug("user answers fetched", extra={
+        "user_id": user_id, "quiz_id": quiz_id, "skip": skip, "limit": limit, "count": len(result)
+    })
     return result
 
 # Remaining functions (unchanged)
 def create_score_record(db: Session, user_id: int, score: float, quiz_id: int = None):
     """Create a score-only record (for quiz completion tracking)"""
-    logger.info(f"📊 CREATE_SCORE_RECORD: Creating score record - user_id={user_id}, score={score}, quiz_id={quiz_id}")
-    
     # Create a score-only answer record (question_id and choice_id will be NULL)
     db_answer = Answer(
         user_id=user_id,
@@ -237,17 +443,22 @@ def create_score_record(db: Session, user_id: int, score: float, quiz_id: int =
     
     # Update user's total score
     user = db.query(User).filter(User.id == user_id).first()
+    total_score = None
     if user:
         user.total_score += score
-        logger.info(f"📊 CREATE_SCORE_RECORD: Updated user total score to {user.total_score}")
+        total_score = user.total_score
     
     try:
         db.commit()
         db.refresh(db_answer)
-        logger.info(f"✅ CREATE_SCORE_RECORD: Created score record with ID {db_answer.id}")
+        payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+        auth.user_cache.invalidate(user_id)
+        logger.debug("score record created", extra={
+            "answer_id": db_answer.id, "user_id": user_id, "quiz_id": quiz_id, "score": score, "total_score": total_score
+        })
         return db_answer
     except Exception as e:
-        logger.error(f"💥 CREATE_SCORE_RECORD: Failed to create score record - {str(e)}")
+        logger.error("score record commit failed", extra={"user_id": user_id, "quiz_id": quiz_id, "error": str(e)})
         db.rollback()
         return None
 
@@ -269,12 +480,26 @@ def get_quiz(db: Session, quiz_id: int):
     }
 
 def get_quizzes(db: Session, skip: int = 0, limit: int = 100):
+    """Get a page of quizzes, served from the quiz cache when possible"""
+    return payload_cache.get_or_load(QUIZ_LIST_NAMESPACE, f"{skip}:{limit}", lambda: _load_quizzes(db, skip, limit))
+
+def _load_quizzes(db: Session, skip: int, limit: int):
+    """Load a page of quizzes with their question IDs in two queries"""
     quizzes = db.query(Quiz).offset(skip).limit(limit).all()
-    result = []
+    if not quizzes:
+        return []
     
+    # Fetch question IDs for the whole page at once instead of one query per quiz
+    question_ids_by_quiz = {quiz.id: [] for quiz in quizzes}
+    quiz_questions = db.query(QuizQuestion.quiz_id, QuizQuestion.question_id).filter(
+        QuizQuestion.quiz_id.in_(question_ids_by_quiz.keys())
+    ).order_by(QuizQuestion.quiz_id, QuizQuestion.question_id).all()
+    for quiz_id, question_id in quiz_questions:
+        question_ids_by_quiz[quiz_id].append(question_id)
+    
+    result = []
     for quiz in quizzes:
-        question_ids = [q.question_id for q in db.query(QuizQuestion).filter(
-            QuizQuestion.quiz_id == quiz.id).all()]
+        question_ids = question_ids_by_quiz[quiz.id]
         
         quiz_dict = {
             "id": quiz.id,
@@ -309,9 +534,12 @@ def create_quiz(db: Session, quiz: schemas.QuizCreate, creator_id: int):
     for question_id in quiz.questions:
         quiz_question = QuizQuestion(quiz_id=db_quiz.id, question_id=question_id)
         db.add(quiz_question)
+    # Existing answers to these questions now count toward the quiz
+    stats.record_quiz_links(db, db_quiz.id, added=quiz.questions)
     
     db.commit()
     db.refresh(db_quiz)
+    payload_cache.invalidate(QUIZ_LIST_NAMESPACE)
     
     quiz_dict = {
         "id": db_quiz.id,
@@ -328,24 +556,37 @@ def create_quiz(db: Session, quiz: schemas.QuizCreate, creator_id: int):
     return quiz_dict
 
 def update_quiz(db: Session, quiz_id: int, quiz: schemas.QuizUpdate):
+    """Apply only what changed: edited fields plus the added and removed question links
+
+    The returned dict has a "changes" entry; nothing is written or
+    invalidated when the update matches the stored quiz.
+    """
     db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if db_quiz:
-        db_quiz.title = quiz.title
-        db_quiz.description = quiz.description
-        db_quiz.category = quiz.category
-        db_quiz.difficulty = quiz.difficulty
-        db_quiz.time_limit = quiz.time_limit
-        
-        # Remove all existing questions
-        db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).delete()
-        
-        # Add new questions
-        for question_id in quiz.questions:
-            quiz_question = QuizQuestion(quiz_id=quiz_id, question_id=question_id)
-            db.add(quiz_question)
-        
-        db.commit()
-        db.refresh(db_quiz)
+        changes = {"fields": [], "questions_added": [], "questions_removed": []}
+        for field in ("title", "description", "category", "difficulty", "time_limit"):
+            if getattr(db_quiz, field) != getattr(quiz, field):
+                setattr(db_quiz, field, getattr(quiz, field))
+                changes["fields"].append(field)
+
+        question_ids = list(dict.fromkeys(int(qid) for qid in quiz.questions))
+        current = set(db.scalars(select(QuizQuestion.question_id).where(QuizQuestion.quiz_id == quiz_id)))
+        changes["questions_added"] = [question_id for question_id in question_ids if question_id not in current]
+        changes["questions_removed"] = sorted(current.difference(question_ids))
+        if changes["questions_added"]:
+            db.execute(insert(QuizQuestion), [
+                {"quiz_id": quiz_id, "question_id": question_id} for question_id in changes["questions_added"]
+            ])
+        if changes["questions_removed"]:
+            db.query(QuizQuestion).filter(
+                QuizQuestion.quiz_id == quiz_id, QuizQuestion.question_id.in_(changes["questions_removed"])
+            ).delete(synchronize_session=False)
+        stats.record_quiz_links(db, quiz_id, added=changes["questions_added"], removed=changes["questions_removed"])
+
+        if changes["fields"] or changes["questions_added"] or changes["questions_removed"]:
+            db.commit()
+            db.refresh(db_quiz)
+            payload_cache.invalidate(QUIZ_LIST_NAMESPACE, quiz_namespace(quiz_id))
         
         quiz_dict = {
             "id": db_quiz.id,
@@ -356,7 +597,8 @@ def update_quiz(db: Session, quiz_id: int, quiz: schemas.QuizUpdate):
             "time_limit": db_quiz.time_limit,
             "creator_id": db_quiz.creator_id,
             "created_at": db_quiz.created_at,
-            "questions": [int(qid) for qid in quiz.questions]
+            "questions": question_ids,
+            "changes": changes
         }
         
         return quiz_dict
@@ -373,38 +615,51 @@ def delete_quiz(db: Session, quiz_id: int):
     db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if db_quiz:
         db.delete(db_quiz)
-        
+    
+    # A recreated quiz can get the same id on SQLite and must not inherit these counts
+    stats.forget_quiz(db, quiz_id)
     db.commit()
+    payload_cache.invalidate(QUIZ_LIST_NAMESPACE, quiz_namespace(quiz_id), quiz_leaderboard_namespace(quiz_id))
     return db_quiz
 
 def get_quiz_with_questions(db: Session, quiz_id: int):
-    """Get quiz with properly serialized questions"""
+    """Get quiz with properly serialized questions, served from the quiz cache when possible"""
+    return payload_cache.get_or_load(quiz_namespace(quiz_id), "detail", lambda: _load_quiz_with_questions(db, quiz_id))
+
+def _load_quiz_with_questions(db: Session, quiz_id: int):
+    """Load quiz, questions and choices in three queries"""
     db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if not db_quiz:
         return None
     
-    quiz_questions = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).all()
-    question_ids = [qq.question_id for qq in quiz_questions]
+    quiz_questions = db.query(Question).join(
+        QuizQuestion, QuizQuestion.question_id == Question.id
+    ).filter(QuizQuestion.quiz_id == quiz_id).order_by(Question.id).all()
+    
+    # Load the choices of every question at once instead of lazy-loading them per question
+    choices_by_question = {question.id: [] for question in quiz_questions}
+    if choices_by_question:
+        choices = db.query(Choice.id, Choice.choice_text, Choice.is_correct, Choice.question_id).filter(
+            Choice.question_id.in_(choices_by_question.keys())
+        ).order_by(Choice.question_id, Choice.id).all()
+        for choice in choices:
+            choices_by_question[choice.question_id].append({
+                "id": choice.id,
+                "choice_text": choice.choice_text,
+                "is_correct": choice.is_correct
+            })
     
     questions = []
-    for q_id in question_ids:
-        question = db.query(Question).filter(Question.id == q_id).first()
-        if question:
-            question_dict = {
-                "id": question.id,
-                "question_text": question.question_text,
-                "score": question.score,
-                "creator_id": question.creator_id,
-                "created_at": question.created_at,
-                "choices": [
-                    {
-                        "id": choice.id,
-                        "choice_text": choice.choice_text,
-                        "is_correct": choice.is_correct
-                    } for choice in question.choices
-                ]
-            }
-            questions.append(question_dict)
+    for question in quiz_questions:
+        question_dict = {
+            "id": question.id,
+            "question_text": question.question_text,
+            "score": question.score,
+            "creator_id": question.creator_id,
+            "created_at": question.created_at,
+            "choices": choices_by_question[question.id]
+        }
+        questions.append(question_dict)
     
     quiz_dict = {
         "id": db_quiz.id,
@@ -428,9 +683,8 @@ def get_quiz_question_ids(db: Session, quiz_id: int):
 # QuizScore functions (unchanged)
 def create_quiz_score(db: Session, user_id: int, quiz_id: int, score: float, total_questions: int, correct_answers: int):
     """Create or update a quiz completion score record"""
-    logger.info(f"📊 CREATE_QUIZ_SCORE: user_id={user_id}, quiz_id={quiz_id}, score={score}, correct={correct_answers}/{total_questions}")
-    
-    # Check if user already has a score for this quiz
+    # Serialize with the user's other score writes before reading the previous score
+    user = _lock_user(db, user_id)
     existing_score = db.query(QuizScore).filter(
         QuizScore.user_id == user_id,
         QuizScore.quiz_id == quiz_id
@@ -438,7 +692,6 @@ def create_quiz_score(db: Session, user_id: int, quiz_id: int, score: float, tot
     
     if existing_score:
         # Update existing score (for retakes)
-        logger.info(f"📊 Updating existing quiz score for user {user_id}, quiz {quiz_id}")
         old_score = existing_score.score
         
         existing_score.score = score
@@ -447,18 +700,22 @@ def create_quiz_score(db: Session, user_id: int, quiz_id: int, score: float, tot
         existing_score.completed_at = datetime.utcnow()
         
         # Update user's total score (remove old, add new)
-        user = db.query(User).filter(User.id == user_id).first()
         if user:
             user.total_score = user.total_score - old_score + score
-            logger.info(f"📊 Updated user total score: {user.total_score}")
         
         try:
             db.commit()
             db.refresh(existing_score)
-            logger.info(f"✅ Updated quiz score ID {existing_score.id}")
+            payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+            auth.user_cache.invalidate(user_id)
+            leaderboard.record_score(quiz_id, user_id, score)
+            logger.debug("quiz score updated", extra={
+                "quiz_score_id": existing_score.id, "user_id": user_id, "quiz_id": quiz_id, "score": score,
+                "previous_score": old_score, "correct_answers": correct_answers, "total_questions": total_questions
+            })
             return existing_score
         except Exception as e:
-            logger.error(f"💥 Failed to update quiz score: {str(e)}")
+            logger.error("quiz score commit failed", extra={"user_id": user_id, "quiz_id": quiz_id, "error": str(e)})
             db.rollback()
             return None
     else:
@@ -474,28 +731,211 @@ def create_quiz_score(db: Session, user_id: int, quiz_id: int, score: float, tot
         db.add(db_quiz_score)
         
         # Update user's total score
-        user = db.query(User).filter(User.id == user_id).first()
         if user:
             user.total_score += score
-            logger.info(f"📊 Updated user total score to {user.total_score}")
         
         try:
             db.commit()
             db.refresh(db_quiz_score)
-            logger.info(f"✅ Created new quiz score with ID {db_quiz_score.id}")
+            payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+            auth.user_cache.invalidate(user_id)
+            leaderboard.record_score(quiz_id, user_id, score)
+            logger.debug("quiz score created", extra={
+                "quiz_score_id": db_quiz_score.id, "user_id": user_id, "quiz_id": quiz_id, "score": score,
+                "correct_answers": correct_answers, "total_questions": total_questions
+            })
             return db_quiz_score
         except Exception as e:
-            logger.error(f"💥 Failed to create quiz score: {str(e)}")
+            logger.error("quiz score commit failed", extra={"user_id": user_id, "quiz_id": quiz_id, "error": str(e)})
             db.rollback()
             return None
 
+def submit_quiz_attempt(db: Session, user_id: int, quiz_id: int, answers: List[schemas.AnswerCreate]):
+    """Grade and store a whole quiz attempt in a single transaction
+
+    Previous answers to the same questions are replaced, the user's total score
+    is adjusted by the difference and the QuizScore row is written, exactly as
+    one POST /answers per question followed by POST /quiz-scores would.
+    Returns None if the quiz has no questions, raises ValueError for invalid
+    submissions and AnswerWriteConflict if concurrent writes keep winning.
+    """
+    # Grade in memory against the quiz's cached answer key
+    graded_attempt = grading.grade_attempt(db, quiz_id, answers)
+    if graded_attempt is None:
+        return None
+    attempt_score = graded_attempt["score"]
+    total_questions = graded_attempt["total_questions"]
+    correct_answers = graded_attempt["correct_answers"]
+    
+    now = datetime.utcnow()
+    for attempt in range(1, ANSWER_WRITE_ATTEMPTS + 1):
+        try:
+            answer_ids, quiz_score_dict = _store_quiz_attempt(db, user_id, quiz_id, graded_attempt, now)
+            db.commit()
+            break
+        except IntegrityError as e:
+            # A concurrent write of the same answers or score won; the retry re-reads and replaces them
+            db.rollback()
+            logger.warning("quiz attempt write conflict", extra={
+                "user_id": user_id, "quiz_id": quiz_id, "attempt": attempt, "error": str(e)
+            })
+        except Exception as e:
+            logger.error("quiz attempt commit failed", extra={"user_id": user_id, "quiz_id": quiz_id, "error": str(e)})
+            db.rollback()
+            raise
+    else:
+        raise AnswerWriteConflict(f"Attempt at quiz {quiz_id} conflicted with concurrent writes")
+    
+    payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+    auth.user_cache.invalidate(user_id)
+    leaderboard.record_score(quiz_id, user_id, attempt_score)
+    
+    return {
+        "quiz_id": quiz_id,
+        "score": attempt_score,
+        "total_questions": total_questions,
+        "correct_answers": correct_answers,
+        "quiz_score": quiz_score_dict,
+        "answers": [
+            {
+                "id": answer_ids[question_id],
+                "user_id": user_id,
+                "question_id": question_id,
+                "choice_id": choice_id,
+                "score": score,
+                "is_correct": is_correct,
+                "created_at": now
+            } for question_id, choice_id, score, is_correct in graded_attempt["results"]
+        ]
+    }
+
+def _store_quiz_attempt(db: Session, user_id: int, quiz_id: int, graded_attempt: dict, now: datetime):
+    """Write a graded attempt's answers, score and total without committing
+
+    Returns the answer ids by question and the QuizScore as a dict.
+    """
+    attempt_score = graded_attempt["score"]
+    total_questions = graded_attempt["total_questions"]
+    correct_answers = graded_attempt["correct_answers"]
+    submitted_question_ids = [question_id for question_id, _, _, _ in graded_attempt["results"]]
+    
+    user = _lock_user(db, user_id)
+    existing_answers = {}
+    if submitted_question_ids:
+        existing_answers = {
+            row.question_id: row for row in db.query(
+                Answer.id, Answer.question_id, Answer.score, Answer.is_correct, Answer.created_at
+            ).filter(
+                Answer.user_id == user_id,
+                Answer.question_id.in_(submitted_question_ids)
+            ).all()
+        }
+    
+    answer_updates = []
+    answer_inserts = []
+    stat_changes = []
+    for question_id, choice_id, score, is_correct in graded_attempt["results"]:
+        stat_changes.append((question_id, now, is_correct, 1))
+        previous = existing_answers.get(question_id)
+        if previous:
+            # Replace the previous answer in place (same effect as delete + create)
+            stat_changes.append((question_id, previous.created_at, previous.is_correct, -1))
+            user.total_score = max(0, user.total_score - previous.score)
+            answer_updates.append({
+                "id": previous.id, "choice_id": choice_id, "score": score, "is_correct": is_correct, "created_at": now
+            })
+        else:
+            answer_inserts.append({
+                "user_id": user_id,
+                "question_id": question_id,
+                "choice_id": choice_id,
+                "score": score,
+                "is_correct": is_correct,
+                "created_at": now
+            })
+        user.total_score += score
+    
+    quiz_score = db.query(QuizScore).filter(
+        QuizScore.user_id == user_id,
+        QuizScore.quiz_id == quiz_id
+    ).first()
+    if quiz_score:
+        user.total_score = user.total_score - quiz_score.score + attempt_score
+        quiz_score.score = attempt_score
+        quiz_score.total_questions = total_questions
+        quiz_score.correct_answers = correct_answers
+        quiz_score.completed_at = now
+    else:
+        quiz_score = QuizScore(
+            user_id=user_id,
+            quiz_id=quiz_id,
+            score=attempt_score,
+            total_questions=total_questions,
+            correct_answers=correct_answers,
+            completed_at=now
+        )
+        db.add(quiz_score)
+        user.total_score += attempt_score
+    
+    # One executemany per statement shape instead of one round trip per answer
+    answer_ids = {previous.question_id: previous.id for previous in existing_answers.values()}
+    if answer_updates:
+        db.execute(update(Answer), answer_updates)
+    if answer_inserts:
+        inserted = db.execute(
+            insert(Answer).returning(Answer.id, Answer.question_id, sort_by_parameter_order=True),
+            answer_inserts
+        ).all()
+        answer_ids.update({row.question_id: row.id for row in inserted})
+    stats.record_answer_changes(db, stat_changes)
+    db.flush()
+    return answer_ids, quiz_score_to_dict(quiz_score)
+
+def grade_quiz_from_answers(db: Session, user_id: int, quiz_id: int):
+    """Grade a user's stored answers for a quiz against its answer key
+
+    Returns score, total_questions and correct_answers, or None if the quiz
+    has no questions.
+    """
+    key = grading.get_quiz_answer_key(db, quiz_id)
+    if not key.questions:
+        return None
+    stored_answers = db.query(Answer.question_id, Answer.choice_id).filter(
+        Answer.user_id == user_id,
+        Answer.question_id.in_(key.questions.keys())
+    ).all()
+    # Answers to choices that no longer exist (e.g. after a question edit) count as wrong
+    score = 0.0
+    correct_answers = 0
+    for question_id, choice_id in stored_answers:
+        question = key.questions[question_id]
+        if choice_id in question.correct_choice_ids:
+            score += question.points
+            correct_answers += 1
+    return {"score": score, "total_questions": key.total_questions, "correct_answers": correct_answers}
+
 def get_user_quiz_scores(db: Session, user_id: int):
     """Get all quiz scores for a user"""
     return db.query(QuizScore).filter(QuizScore.user_id == user_id).all()
 
 def get_quiz_scores(db: Session, quiz_id: int):
-    """Get all scores for a specific quiz (leaderboard)"""
-    return db.query(QuizScore).filter(QuizScore.quiz_id == quiz_id).order_by(desc(QuizScore.score)).all()
+    """Get all scores for a specific quiz (leaderboard), served from the cache when possible"""
+    return payload_cache.get_or_load(
+        quiz_leaderboard_namespace(quiz_id), "all",
+        lambda: [quiz_score_to_dict(quiz_score) for quiz_score in
+                 db.query(QuizScore).filter(QuizScore.quiz_id == quiz_id).order_by(desc(QuizScore.score)).all()]
+    )
+
+def quiz_score_to_dict(quiz_score: QuizScore):
+    return {
+        "id": quiz_score.id,
+        "user_id": quiz_score.user_id,
+        "quiz_id": quiz_score.quiz_id,
+        "score": quiz_score.score,
+        "total_questions": quiz_score.total_questions,
+        "correct_answers": quiz_score.correct_answers,
+        "completed_at": quiz_score.completed_at
+    }
 
 def get_user_quiz_score(db: Session, user_id: int, quiz_id: int):
     """Get user's score for a specific quiz"""
@@ -506,14 +946,23 @@ def get_user_quiz_score(db: Session, user_id: int, quiz_id: int):
 
 def delete_quiz_score(db: Session, user_id: int, quiz_id: int):
     """Delete user's quiz score (for complete reset)"""
+    if not get_user_quiz_score(db, user_id, quiz_id):
+        return False
+    
+    # Re-read under the user's lock so a concurrent attempt or reset does not lose a total_score update
+    user = _lock_user(db, user_id)
     quiz_score = get_user_quiz_score(db, user_id, quiz_id)
-    if quiz_score:
-        # Subtract from user's total score
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            user.total_score = max(0, user.total_score - quiz_score.score)
-        
-        db.delete(quiz_score)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    if not quiz_score:
+        db.rollback()
+        return False
+    
+    # Subtract from user's total score
+    if user:
+        user.total_score = max(0, user.total_score - quiz_score.score)
+    
+    db.delete(quiz_score)
+    db.commit()
+    payload_cache.invalidate(USER_LEADERBOARD_NAMESPACE)
+    auth.user_cache.invalidate(user_id)
+    leaderboard.remove_score(quiz_id, user_id)
+    return True
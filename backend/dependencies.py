@@ -0,0 +1,21 @@
+from fastapi import Request
+
+from database import read_session, write_session, writer_key
+
+
+def get_write_db(request: Request):
+    """Primary session; a commit through it sends this client's reads to the primary for a while"""
+    db = write_session(writer_key(request.headers.get("authorization")))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints, served by a replica when READ_REPLICA_URLS is set"""
+    db = read_session(writer_key(request.headers.get("authorization")))
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from database import SessionLocal, Answer, QuizQuestion, QuizScore
+
+EXPORT_BATCH_SIZE = 1000
+
+ANSWER_COLUMNS = ["id", "user_id", "question_id", "choice_id", "score", "is_correct", "created_at"]
+QUIZ_SCORE_COLUMNS = ["id", "user_id", "quiz_id", "score", "total_questions", "correct_answers", "completed_at"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _answers_query(quiz_id: Optional[int], user_id: Optional[int], since: Optional[datetime], until: Optional[datetime]):
+    query = select(
+        Answer.id, Answer.user_id, Answer.question_id, Answer.choice_id, Answer.score,
+        Answer.is_correct, Answer.created_at
+    ).where(
+        Answer.question_id.isnot(None),
+        Answer.choice_id.isnot(None)
+    )
+    if quiz_id is not None:
+        query = query.where(Answer.question_id.in_(
+            select(QuizQuestion.question_id).where(QuizQuestion.quiz_id == quiz_id)
+        ))
+    if user_id is not None:
+        query = query.where(Answer.user_id == user_id)
+    if since is not None:
+        query = query.where(Answer.created_at >= since)
+    if until is not None:
+        query = query.where(Answer.created_at < until)
+    return query.order_by(Answer.id)
+
+
+def _quiz_scores_query(quiz_id: Optional[int], user_id: Optional[int], since: Optional[datetime], until: Optional[datetime]):
+    query = select(
+        QuizScore.id, QuizScore.user_id, QuizScore.quiz_id, QuizScore.score,
+        QuizScore.total_questions, QuizScore.correct_answers, QuizScore.completed_at
+    )
+    if quiz_id is not None:
+        query = query.where(QuizScore.quiz_id == quiz_id)
+    if user_id is not None:
+        query = query.where(QuizScore.user_id == user_id)
+    if since is not None:
+        query = query.where(QuizScore.completed_at >= since)
+    if until is not None:
+        query = query.where(QuizScore.completed_at < until)
+    return query.order_by(QuizScore.id)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream(query, columns, fmt: str) -> Iterator[str]:
+    """Yield the rows of query as NDJSON lines or CSV, one chunk per batch
+
+    Uses its own session so the export does not depend on the request's
+    session staying open while the response streams.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for batch in result.partitions():
+                for row in batch:
+                    writer.writerow([_encode_value(value) for value in row])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for batch in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, (_encode_value(value) for value in row)))) + "\n"
+                    for row in batch
+                )
+    finally:
+        db.close()
+
+
+def stream_answers(fmt: str = "ndjson", quiz_id: Optional[int] = None, user_id: Optional[int] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[str]:
+    """Stream every answer (with is_correct) matching the filters"""
+    return _stream(_answers_query(quiz_id, user_id, since, until), ANSWER_COLUMNS, fmt)
+
+
+def stream_quiz_scores(fmt: str = "ndjson", quiz_id: Optional[int] = None, user_id: Optional[int] = None,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[str]:
+    """Stream every quiz score matching the filters"""
+    return _stream(_quiz_scores_query(quiz_id, user_id, since, until), QUIZ_SCORE_COLUMNS, fmt)
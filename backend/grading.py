@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database import Choice, Question, QuizQuestion
+from cache import payload_cache, quiz_namespace, question_namespace
+
+# Answer Key Configuration
+# Upper bound on how long an in-process key is trusted, for writes whose invalidation
+# this process cannot see (another process on the memory backend, manual SQL)
+ANSWER_KEY_TTL_SECONDS = float(os.getenv("ANSWER_KEY_TTL_SECONDS", "5"))
+
+
+class QuestionKey:
+    """Points and choice correctness for one question"""
+
+    __slots__ = ("question_id", "points", "choice_ids", "correct_choice_ids")
+
+    def __init__(self, question_id: int, points: float):
+        self.question_id = question_id
+        self.points = points
+        self.choice_ids = set()
+        self.correct_choice_ids = set()
+
+    def grade(self, choice_id: int):
+        """Return (score, is_correct), raising ValueError if the choice is not one of this question's"""
+        if choice_id not in self.choice_ids:
+            raise ValueError(f"Invalid choice {choice_id} for question {self.question_id}")
+        is_correct = choice_id in self.correct_choice_ids
+        return (self.points if is_correct else 0.0), is_correct
+
+
+class AnswerKey:
+    """Answer key for a quiz: question ID -> QuestionKey, in question order"""
+
+    def __init__(self, generation: int, questions: Dict[int, QuestionKey]):
+        self.generation = generation
+        self.questions = questions
+        self.loaded_at = time.monotonic()
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    def grade(self, answers) -> dict:
+        """Grade (question_id, choice_id) pairs in memory
+
+        Raises ValueError for duplicate questions or choices that are not
+        part of this quiz.
+        """
+        seen = set()
+        results = []
+        score = 0.0
+        correct_answers = 0
+        for question_id, choice_id in answers:
+            if question_id in seen:
+                raise ValueError("Each question can only be answered once per attempt")
+            seen.add(question_id)
+            question = self.questions.get(question_id)
+            if question is None:
+                raise ValueError(f"Question {question_id} is not part of this quiz")
+            answer_score, is_correct = question.grade(choice_id)
+            score += answer_score
+            correct_answers += 1 if is_correct else 0
+            results.append((question_id, choice_id, answer_score, is_correct))
+        return {
+            "score": score,
+            "total_questions": self.total_questions,
+            "correct_answers": correct_answers,
+            "results": results
+        }
+
+
+def _build_keys(rows) -> Dict[int, QuestionKey]:
+    questions = {}
+    for question_id, points, choice_id, is_correct in rows:
+        question = questions.get(question_id)
+        if question is None:
+            question = questions[question_id] = QuestionKey(question_id, points)
+        if choice_id is not None:
+            question.choice_ids.add(choice_id)
+            if is_correct:
+                question.correct_choice_ids.add(choice_id)
+    return questions
+
+
+# In-process answer keys. Each is tagged with the generation of its cache namespace,
+# which question and quiz writes bump, so edits by any worker sharing the cache
+# backend force a rebuild; ANSWER_KEY_TTL_SECONDS bounds staleness otherwise.
+_quiz_keys = {}
+_question_keys = {}
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def get_quiz_answer_key(db: Session, quiz_id: int) -> AnswerKey:
+    """Get the answer key for a quiz (built with a single query, then cached)"""
+    global _hits, _misses
+    generation = payload_cache.backend.get_generation(quiz_namespace(quiz_id))
+    with _lock:
+        key = _quiz_keys.get(quiz_id)
+    if key is not None and key.generation == generation and time.monotonic() - key.loaded_at < ANSWER_KEY_TTL_SECONDS:
+        _hits += 1
+        return key
+    _misses += 1
+
+    rows = db.query(Question.id, Question.score, Choice.id, Choice.is_correct).join(
+        QuizQuestion, QuizQuestion.question_id == Question.id
+    ).outerjoin(
+        Choice, Choice.question_id == Question.id
+    ).filter(QuizQuestion.quiz_id == quiz_id).order_by(Question.id, Choice.id).all()
+    key = AnswerKey(generation, _build_keys(rows))
+    with _lock:
+        _quiz_keys[quiz_id] = key
+    return key
+
+
+def get_question_key(db: Session, question_id: int) -> Optional[QuestionKey]:
+    """Get the answer key for a single question, or None if it does not exist"""
+    global _hits, _misses
+    generation = payload_cache.backend.get_generation(question_namespace(question_id))
+    with _lock:
+        cached = _question_keys.get(question_id)
+    if cached is not None and cached[0] == generation and time.monotonic() - cached[1] < ANSWER_KEY_TTL_SECONDS:
+        _hits += 1
+        return cached[2]
+    _misses += 1
+
+    rows = db.query(Question.id, Question.score, Choice.id, Choice.is_correct).outerjoin(
+        Choice, Choice.question_id == Question.id
+    ).filter(Question.id == question_id).all()
+    key = _build_keys(rows).get(question_id)
+    if key is not None:
+        with _lock:
+            _question_keys[question_id] = (generation, time.monotonic(), key)
+    return key
+
+
+def stats() -> dict:
+    lookups = _hits + _misses
+    with _lock:
+        entries = len(_quiz_keys) + len(_question_keys)
+    return {
+        "entries": entries,
+        "hits": _hits,
+        "misses": _misses,
+        "hit_rate": round(_hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def grade_attempt(db: Session, quiz_id: int, answers: List) -> Optional[dict]:
+    """Grade schemas.AnswerCreate items against a quiz; None if the quiz has no questions"""
+    key = get_quiz_answer_key(db, quiz_id)
+    if not key.questions:
+        return None
+    return key.grade((answer.question_id, answer.choice_id) for answer in answers)
@@ -0,0 +1,179 @@
+import bisect
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from database import QuizScore, User
+from cache import payload_cache, quiz_leaderboard_namespace
+
+# Leaderboard Configuration
+# Upper bound on how long an in-process board is trusted, for score writes whose
+# invalidation this process cannot see (another process on the memory backend)
+LEADERBOARD_TTL_SECONDS = float(os.getenv("LEADERBOARD_TTL_SECONDS", "10"))
+
+
+class QuizLeaderboard:
+    """Sorted leaderboard for one quiz
+
+    Entries are kept as (-score, user_id) keys in a sorted list, so rank
+    lookups are a binary search and pages are slices. Users with the same
+    score share a rank (1, 2, 2, 4) and are listed by user ID. Inserting
+    into the list shifts the entries after it, so an upsert is O(n) memmove:
+    about 30 us at 100k entries, which is cheaper than a tree at these sizes.
+    """
+
+    def __init__(self, generation: int, rows, ttl_seconds: float = LEADERBOARD_TTL_SECONDS):
+        self.generation = generation
+        self.expires_at = time.monotonic() + ttl_seconds
+        self._score_by_user = {user_id: score for user_id, score in rows}
+        self._keys = sorted((-score, user_id) for user_id, score in self._score_by_user.items())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def upsert(self, user_id: int, score: float):
+        self.remove(user_id)
+        self._score_by_user[user_id] = score
+        bisect.insort(self._keys, (-score, user_id))
+
+    def remove(self, user_id: int):
+        old_score = self._score_by_user.pop(user_id, None)
+        if old_score is not None:
+            del self._keys[bisect.bisect_left(self._keys, (-old_score, user_id))]
+
+    def rank_for_score(self, score: float) -> int:
+        # (-score,) sorts before every key with that score, so this counts strictly higher scores
+        return bisect.bisect_left(self._keys, (-score,)) + 1
+
+    def position_of(self, user_id: int) -> Optional[int]:
+        score = self._score_by_user.get(user_id)
+        if score is None:
+            return None
+        return bisect.bisect_left(self._keys, (-score, user_id))
+
+    def slice(self, start: int, stop: int):
+        """Return (rank, user_id, score) tuples for positions start..stop-1"""
+        return [
+            (self.rank_for_score(-neg_score), user_id, -neg_score)
+            for neg_score, user_id in self._keys[max(0, start):stop]
+        ]
+
+
+# In-process boards, keyed by quiz ID. A board is trusted only while its generation
+# matches the quiz leaderboard generation in the cache backend, so writes made by
+# other workers sharing the backend force a reload, and for at most LEADERBOARD_TTL_SECONDS.
+_boards = {}
+_lock = threading.Lock()
+
+
+def _generation(quiz_id: int) -> int:
+    return payload_cache.backend.get_generation(quiz_leaderboard_namespace(quiz_id))
+
+
+def get_board(db: Session, quiz_id: int) -> QuizLeaderboard:
+    generation = _generation(quiz_id)
+    with _lock:
+        board = _boards.get(quiz_id)
+        if board is not None and board.generation == generation and time.monotonic() < board.expires_at:
+            return board
+    # A board read from a replica right after a score write may miss it; keep it only until replicas catch up
+    lag_window = payload_cache.lag_window(quiz_leaderboard_namespace(quiz_id))
+    rows = db.query(QuizScore.user_id, QuizScore.score).filter(QuizScore.quiz_id == quiz_id).all()
+    board = QuizLeaderboard(generation, rows, min(LEADERBOARD_TTL_SECONDS, lag_window) if lag_window else LEADERBOARD_TTL_SECONDS)
+    with _lock:
+        _boards[quiz_id] = board
+    return board
+
+
+def _apply(quiz_id: int, update):
+    """Bump the quiz leaderboard generation and apply update to the local board
+
+    The local board is only patched when it was current right before this
+    write; otherwise it is dropped and rebuilt on the next read.
+    """
+    generation = payload_cache.backend.bump_generation(quiz_leaderboard_namespace(quiz_id))
+    payload_cache.mark_written(quiz_leaderboard_namespace(quiz_id))
+    with _lock:
+        board = _boards.get(quiz_id)
+        if board is None:
+            return
+        if board.generation != generation - 1:
+            del _boards[quiz_id]
+            return
+        update(board)
+        board.generation = generation
+
+
+def record_score(quiz_id: int, user_id: int, score: float):
+    """Call after a quiz score has been committed"""
+    _apply(quiz_id, lambda board: board.upsert(user_id, score))
+
+
+def remove_score(quiz_id: int, user_id: int):
+    """Call after a quiz score has been deleted"""
+    _apply(quiz_id, lambda board: board.remove(user_id))
+
+
+def _entries(db: Session, quiz_id: int, ranked):
+    """Attach quiz score details and usernames to (rank, user_id, score) tuples"""
+    if not ranked:
+        return []
+    user_ids = [user_id for _, user_id, _ in ranked]
+    rows = db.query(QuizScore, User.username).join(User, User.id == QuizScore.user_id).filter(
+        QuizScore.quiz_id == quiz_id,
+        QuizScore.user_id.in_(user_ids)
+    ).all()
+    details = {quiz_score.user_id: (quiz_score, username) for quiz_score, username in rows}
+
+    entries = []
+    for rank, user_id, score in ranked:
+        if user_id not in details:
+            continue
+        quiz_score, username = details[user_id]
+        entries.append({
+            "rank": rank,
+            "user_id": user_id,
+            "username": username,
+            "quiz_id": quiz_id,
+            "score": score,
+            "total_questions": quiz_score.total_questions,
+            "correct_answers": quiz_score.correct_answers,
+            "completed_at": quiz_score.completed_at
+        })
+    return entries
+
+
+def get_top(db: Session, quiz_id: int, skip: int = 0, limit: int = 10):
+    """Get a page of the quiz leaderboard"""
+    board = get_board(db, quiz_id)
+    return {
+        "quiz_id": quiz_id,
+        "total": len(board),
+        "entries": _entries(db, quiz_id, board.slice(skip, skip + limit))
+    }
+
+
+def get_user_rank(db: Session, quiz_id: int, user_id: int):
+    """Get a user's leaderboard entry for a quiz, or None if they have no score"""
+    board = get_board(db, quiz_id)
+    position = board.position_of(user_id)
+    if position is None:
+        return None
+    entries = _entries(db, quiz_id, board.slice(position, position + 1))
+    return entries[0] if entries else None
+
+
+def get_around_user(db: Session, quiz_id: int, user_id: int, radius: int = 5):
+    """Get the entries within radius positions above and below a user, or None if they have no score"""
+    board = get_board(db, quiz_id)
+    position = board.position_of(user_id)
+    if position is None:
+        return None
+    return {
+        "quiz_id": quiz_id,
+        "total": len(board),
+        "entries": _entries(db, quiz_id, board.slice(position - radius, position + radius + 1))
+    }
@@ -0,0 +1,183 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Logging Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")  # per-logger overrides, e.g. "crud=DEBUG,sqlalchemy.engine=INFO"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))  # share of requests whose DEBUG lines are kept
+LOG_QUEUE = os.getenv("LOG_QUEUE", "1") == "1"  # write from a background thread instead of the request thread
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+debug_sampled_var = contextvars.ContextVar("debug_sampled", default=True)
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def record_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """level logger message key=value ... for the structured fields"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = record_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the structured fields at the top level"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(record_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Tags records with the request id and drops DEBUG records of unsampled requests
+
+    The sampling decision is made once per request, so a sampled request keeps
+    all of its DEBUG lines and the others keep none.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and not debug_sampled_var.get():
+            self.dropped += 1
+            return False
+        request_id = request_id_var.get()
+        if request_id is not None:
+            record.request_id = request_id
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; drops them instead of blocking when the queue is full
+
+    The record is queued as is: formatting happens on the listener thread, so
+    log arguments must be plain values rather than live ORM objects.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingSetup:
+    def __init__(self):
+        self.handler: Optional[logging.Handler] = None
+        self.listener: Optional[QueueListener] = None
+        self.filter = RequestContextFilter()
+
+    def configure(self):
+        """Install the root handler and per-logger levels; safe to call more than once"""
+        if self.handler is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+        if LOG_QUEUE:
+            self.handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+            self.listener = QueueListener(self.handler.queue, stream_handler, respect_handler_level=True)
+            self.listener.start()
+            atexit.register(self.stop)
+        else:
+            self.handler = stream_handler
+        self.handler.addFilter(self.filter)
+
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(LOG_LEVEL)
+        for name, level in parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+    def stop(self):
+        """Flush queued records; registered with atexit"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self) -> dict:
+        return {
+            "level": LOG_LEVEL,
+            "levels": parse_levels(LOG_LEVELS),
+            "format": LOG_FORMAT,
+            "queue": LOG_QUEUE,
+            "queued": self.handler.queue.qsize() if isinstance(self.handler, QueueHandler) else 0,
+            "dropped_queue_full": getattr(self.handler, "dropped", 0),
+            "debug_sample_rate": LOG_DEBUG_SAMPLE_RATE,
+            "dropped_unsampled_debug": self.filter.dropped,
+        }
+
+
+def parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class RequestContextMiddleware:
+    """ASGI middleware that gives every request an id and a DEBUG sampling decision"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        id_token = request_id_var.set(request_id or secrets.token_hex(8))
+        sampled_token = debug_sampled_var.set(random.random() < LOG_DEBUG_SAMPLE_RATE)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_id_var.reset(id_token)
+            debug_sampled_var.reset(sampled_token)
+
+
+# Global logging setup
+logging_setup = LoggingSetup()
@@ -1,21 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
+from fastapi import FastAPI, Depends, File, HTTPException, Query, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from database import Choice, get_db, User, Answer, QuizScore
+from dependencies import get_read_db, get_write_db
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
 
 import schemas
 import crud
 import auth
+import database
+import leaderboard
+import grading
+import export
+import question_import
+import stats
+import logs
+import metrics
+from cache import payload_cache
+from passwords import password_pool, PasswordQueueFull
 from database import get_db, User, QuizScore
 
 app = FastAPI(title="QuizKi API", description="Quiz Application API", version="1.0.0")
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logs.logging_setup.configure()
 logger = logging.getLogger(__name__)
 
 # CORS middleware
@@ -29,29 +41,65 @@ app.add_middleware(
     max_age=600,
 )
 
-security = HTTPBearer(auto_error=False)
+# Per-route latency and SQL statement counts; added before the logging middleware
+# so its threshold warnings carry the request id
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Request ids and DEBUG sampling for log records
+app.add_middleware(logs.RequestContextMiddleware)
+
+# With an async engine configured, the hot read endpoints are served by async
+# handlers; they are registered first so they take precedence over the sync ones below
+if database.AsyncSessionLocal is not None:
+    import async_routes
+    unsupported = async_routes.unsupported_reason()
+    if unsupported:
+        logger.warning("async routes disabled, serving the sync routes", extra={"reason": unsupported})
+    else:
+        app.include_router(async_routes.router)
 
 # Health check endpoint
 @app.get("/health-check")
 async def health_check():
     return {"status": "healthy", "message": "QuizKi API is running"}
 
+# Prometheus scrape endpoint; per process, so scrape each worker or run one per node
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Auth endpoints
+# bcrypt runs on the password pool, so these handlers are async and only use
+# the threadpool for their short database calls
+def password_pool_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login requests, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_username(db, username=user.username)
+async def register(user: schemas.UserCreate, db: Session = Depends(get_write_db)):
+    db_user = await run_in_threadpool(crud.get_user_by_username, db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await password_pool.hash(user.password)
+    except PasswordQueueFull:
+        raise password_pool_busy()
+    return await run_in_threadpool(crud.create_user, db=db, user=user, hashed_password=hashed_password)
 
 @app.post("/login", response_model=schemas.Token)
-def login(user_login: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = auth.authenticate_user(db, user_login.username, user_login.password)
+async def login(user_login: schemas.UserLogin, db: Session = Depends(get_write_db)):
+    try:
+        user = await auth.authenticate_user_async(db, user_login.username, user_login.password)
+    except PasswordQueueFull:
+        raise password_pool_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,8 +107,8 @@ def login(user_login: schemas.UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    access_token = await run_in_threadpool(
+        auth.create_user_access_token, db, user, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -69,27 +117,43 @@ def login(user_login: schemas.UserLogin, db: Session = Depends(get_db)):
 def get_users(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    credentials = Depends(security)
-):
-    current_user = None
-    if credentials:
-        try:
-            current_user = auth.get_current_user(credentials, db)
-        except HTTPException:
-            pass
-    
+    db: Session = Depends(get_read_db),
+    current_user: Optional[User] = Depends(auth.get_current_user_optional)
+):
     users = crud.get_users(db, skip=skip, limit=limit)
     
     if current_user and current_user.role == "admin":
         return users
     else:
-        return [schemas.UserPublic(username=user.username, total_score=user.total_score) for user in users]
+        return [schemas.UserPublic(username=user["username"], total_score=user["total_score"]) for user in users]
+
+@app.get("/leaderboard", response_model=schemas.UserLeaderboardPage)
+def get_leaderboard(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_read_db)
+):
+    """Get a page of the global leaderboard; pass next_cursor from the previous page to continue"""
+    try:
+        return crud.get_leaderboard_page(db, limit=max(1, min(limit, 100)), cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/users/{user_id}/rank", response_model=schemas.UserRankResponse)
+def get_user_rank(
+    user_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """Get a user's rank on the global leaderboard"""
+    rank = crud.get_user_rank(db, user_id=user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rank
 
 @app.get("/users/{user_id}", response_model=schemas.UserResponse)
 def get_user(
     user_id: int, 
-    db: Session = Depends(get_db), 
+    db: Session = Depends(get_write_db), 
     current_user: User = Depends(auth.get_current_user)
 ):
     user = crud.get_user(db, user_id=user_id)
@@ -109,16 +173,9 @@ def get_current_user_info(current_user: User = Depends(auth.get_current_user)):
 @app.get("/questions/{question_id}", response_model=schemas.QuestionResponse)
 def get_question(
     question_id: int, 
-    db: Session = Depends(get_db),
-    credentials = Depends(security)
-):
-    current_user = None
-    if credentials:
-        try:
-            current_user = auth.get_current_user(credentials, db)
-        except HTTPException:
-            pass
-    
+    db: Session = Depends(get_write_db),
+    current_user: Optional[User] = Depends(auth.get_current_user_optional)
+):
     question = crud.get_question(db, question_id=question_id)
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
@@ -135,58 +192,123 @@ def get_question(
 
 @app.get("/admin/statistics")
 def get_admin_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
-    """Get statistics for admin dashboard"""
-    from sqlalchemy.sql import func
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    logger.info("Calculating admin statistics...")
-    
-    # Count valid answers
-    total_answers = db.query(Answer).filter(
-        Answer.question_id.isnot(None),
-        Answer.choice_id.isnot(None)
-    ).count()
-    logger.info(f"Total valid answers: {total_answers}")
-    
-    # Count correct answers
-    correct_answers = db.query(Answer).join(
-        Choice, Answer.choice_id == Choice.id
-    ).filter(
-        Choice.is_correct == True,
-        Answer.question_id.isnot(None),
-        Answer.choice_id.isnot(None)
-    ).count()
-    
-    # Calculate percentage of correct answers
-    if total_answers > 0:
-        avg_score = round(correct_answers * 100 / total_answers)
-        logger.info(f"Correct answers: {correct_answers}/{total_answers} = {avg_score}%")
-    else:
-        avg_score = 0
-        logger.info("No answers found, setting average score to 0%")
-    
-    return {
-        "total_answers": total_answers, 
-        "average_score": avg_score
-    }
+    """Get statistics for admin dashboard (read from the running answer counters)"""
+    return stats.get_summary(db)
+
+@app.get("/admin/statistics/questions")
+def get_question_statistics(
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Get per-question answer counts and accuracy, hardest first (Admin only)"""
+    return stats.get_question_accuracy(db)
+
+@app.get("/admin/analytics/questions")
+def get_question_analytics(
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Get item statistics (p-value, choice distribution, discrimination) for every question (Admin only)"""
+    import analytics  # numpy is only needed here, keep it off the import path of every worker
+    return analytics.get_item_statistics(db)
+
+@app.post("/admin/statistics/reconcile")
+def reconcile_statistics(
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Rebuild the answer counters from scratch (Admin only)"""
+    counters = stats.reconcile(db)
+    return {"message": "Statistics rebuilt", "counters": counters}
+
+@app.get("/admin/export/answers")
+def export_answers(
+    format: str = "ndjson",
+    quiz_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(auth.require_admin)
+):
+    """Stream all answers as NDJSON or CSV (Admin only)"""
+    if format not in export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        export.stream_answers(format, quiz_id=quiz_id, user_id=user_id, since=since, until=until),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=answers.{format}"}
+    )
+
+@app.get("/admin/export/quiz-scores")
+def export_quiz_scores(
+    format: str = "ndjson",
+    quiz_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(auth.require_admin)
+):
+    """Stream all quiz scores as NDJSON or CSV (Admin only)"""
+    if format not in export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        export.stream_quiz_scores(format, quiz_id=quiz_id, user_id=user_id, since=since, until=until),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=quiz-scores.{format}"}
+    )
+
+@app.get("/admin/password-pool")
+def get_password_pool_statistics(current_user: User = Depends(auth.require_admin)):
+    """Concurrency and queue depth of the bcrypt worker pool"""
+    return {"password_pool": password_pool.stats()}
+
+@app.get("/admin/logging")
+def get_logging_statistics(current_user: User = Depends(auth.require_admin)):
+    """Log levels, queue depth and how many records were dropped or sampled out"""
+    return {"logging": logs.logging_setup.stats()}
+
+@app.get("/admin/cache")
+def get_cache_statistics(current_user: User = Depends(auth.require_admin)):
+    """Get hit/miss counters and size of the quiz and leaderboard payload cache"""
+    return {"cache": payload_cache.stats(), "auth_user_cache": auth.user_cache.stats(), "token_cache": auth.token_cache.stats()}
+
+@app.put("/admin/users/{user_id}/role", response_model=schemas.UserResponse)
+def update_user_role(
+    user_id: int,
+    role_update: schemas.UserRoleUpdate,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Change a user's role; their existing tokens are revoked"""
+    if role_update.role not in ("user", "admin"):
+        raise HTTPException(status_code=400, detail="Role must be 'user' or 'admin'")
+    db_user = crud.update_user_role(db, user_id, role_update.role)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+@app.post("/admin/users/{user_id}/revoke-tokens")
+def revoke_user_tokens(
+    user_id: int,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Revoke every token issued to a user so far"""
+    if crud.get_user(db, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    auth.revoke_user_tokens(db, user_id)
+    return {"message": f"Tokens for user {user_id} have been revoked"}
+
 @app.get("/questions", response_model=List[schemas.QuestionResponse])
 def get_questions(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    credentials = Depends(security)
-):
-    current_user = None
-    if credentials:
-        try:
-            current_user = auth.get_current_user(credentials, db)
-        except HTTPException:
-            pass
-    
+    db: Session = Depends(get_write_db),
+    current_user: Optional[User] = Depends(auth.get_current_user_optional)
+):
     questions = crud.get_questions(db, skip=skip, limit=limit)
     
     result = []
@@ -202,27 +324,46 @@ def get_questions(
 @app.post("/questions", response_model=schemas.QuestionResponse)
 def create_question(
     question: schemas.QuestionCreateWithChoices, 
-    db: Session = Depends(get_db), 
+    db: Session = Depends(get_write_db), 
     current_user: User = Depends(auth.require_admin)
 ):
     return crud.create_question(db=db, question=question, creator_id=current_user.id)
 
-@app.put("/questions/{question_id}", response_model=schemas.QuestionResponse)
+@app.post("/admin/import/questions", response_model=schemas.QuestionImportResult)
+def import_questions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.require_admin)
+):
+    """Create questions from a JSON or CSV question bank in batched transactions; bad rows are reported, not fatal"""
+    try:
+        records = question_import.load(file.file.read(), question_import.detect_format(file.filename, format))
+    except question_import.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return question_import.import_questions(db, records, creator_id=current_user.id)
+
+@app.put("/questions/{question_id}", response_model=schemas.QuestionUpdateResponse)
 def update_question(
     question_id: int,
-    question: schemas.QuestionCreateWithChoices,
-    db: Session = Depends(get_db),
+    question: schemas.QuestionUpdate,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
-    db_question = crud.update_question(db, question_id=question_id, question=question)
-    if db_question is None:
+    """Update a question in place; choices keep their ids when sent with their id (or unchanged text)"""
+    try:
+        result = crud.update_question(db, question_id=question_id, question=question)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
         raise HTTPException(status_code=404, detail="Question not found")
-    return db_question
+    db_question, changes = result
+    return {**schemas.QuestionResponse.model_validate(db_question).model_dump(), "changes": changes}
 
 @app.delete("/questions/{question_id}")
 def delete_question(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
     try:
@@ -233,39 +374,30 @@ def delete_question(
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
-        logger.error(f"Error deleting question {question_id}: {str(e)}")
+        logger.error("question delete failed", extra={"question_id": question_id, "error": str(e)})
         raise HTTPException(status_code=500, detail="Error deleting question")
 
 @app.post("/answers", response_model=schemas.AnswerResponse)
 def submit_answer(
     answer: schemas.AnswerCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    logger.info(f"Received answer submission: question_id={answer.question_id}, choice_id={answer.choice_id}")
-    logger.info(f"User ID: {current_user.id}")
-    
-    # Check if user already answered this question
-    existing_answer = crud.get_user_answer_for_question(db, user_id=current_user.id, question_id=answer.question_id)
-    if existing_answer:
-        logger.info(f"User {current_user.id} already answered question {answer.question_id}")
-        
-        # Delete the previous answer instead of rejecting it
-        crud.delete_user_answer(db, user_id=current_user.id, question_id=answer.question_id)
-        logger.info(f"Deleted previous answer for question {answer.question_id}")
-    
     # Verify that the choice belongs to the question
-    choice = crud.get_choice(db, choice_id=answer.choice_id)
-    if not choice or choice.question_id != answer.question_id:
+    question_key = grading.get_question_key(db, question_id=answer.question_id)
+    if not question_key or answer.choice_id not in question_key.choice_ids:
         raise HTTPException(status_code=400, detail="Invalid choice for this question")
     
-    # Fixed function parameters
-    db_answer = crud.create_answer(
-        db=db,
-        user_id=current_user.id,
-        question_id=answer.question_id, 
-        choice_id=answer.choice_id
-    )
+    # Replaces the previous answer to the question, if any
+    try:
+        db_answer = crud.create_answer(
+            db=db,
+            user_id=current_user.id,
+            question_id=answer.question_id,
+            choice_id=answer.choice_id
+        )
+    except crud.AnswerWriteConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
     if db_answer is None:
         raise HTTPException(status_code=500, detail="Failed to create answer")
@@ -274,16 +406,20 @@ def submit_answer(
 
 @app.get("/my-answers", response_model=List[schemas.AnswerResponse])
 def get_my_answers(
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    quiz_id: Optional[int] = None,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    return crud.get_user_answers(db, user_id=current_user.id)
+    """Get the current user's answers; without a limit the whole history is streamed"""
+    return crud.get_user_answers(db, user_id=current_user.id, skip=skip, limit=limit, quiz_id=quiz_id)
 
 # NEW: Reset answer endpoint for re-take functionality
 @app.delete("/my-answers/{question_id}")
 def reset_answer(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     """Reset user's answer for a specific question (for re-take quiz functionality)"""
@@ -296,7 +432,7 @@ def reset_answer(
 @app.delete("/quizzes/{quiz_id}/reset-answers")
 def reset_quiz_answers(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     """Reset all user's answers for a specific quiz (for re-take functionality)"""
@@ -315,7 +451,7 @@ def reset_quiz_answers(
             if result:
                 reset_count += 1
         
-        logger.info(f"Reset {reset_count} answers for user {current_user.id} in quiz {quiz_id}")
+        logger.info("quiz answers reset", extra={"user_id": current_user.id, "quiz_id": quiz_id, "count": reset_count})
         
         return {
             "message": f"Reset {reset_count} answers for quiz {quiz_id}",
@@ -324,14 +460,32 @@ def reset_quiz_answers(
             "total_questions": len(quiz_questions)
         }
     except Exception as e:
-        logger.error(f"Error resetting quiz answers: {str(e)}")
+        logger.error("quiz answer reset failed", extra={"user_id": current_user.id, "quiz_id": quiz_id, "error": str(e)})
         raise HTTPException(status_code=500, detail="Failed to reset quiz answers")
 
+@app.post("/quizzes/{quiz_id}/attempts", response_model=schemas.QuizAttemptResponse)
+def submit_quiz_attempt(
+    quiz_id: int,
+    attempt: schemas.QuizAttemptCreate,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Submit all answers of a quiz attempt at once and record the quiz score"""
+    try:
+        result = crud.submit_quiz_attempt(db, user_id=current_user.id, quiz_id=quiz_id, answers=attempt.answers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.AnswerWriteConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Quiz not found or has no questions")
+    return result
+
 # Quiz endpoints with proper serialization
 @app.post("/quizzes")
 def create_quiz(
     quiz: schemas.QuizCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
     return crud.create_quiz(db=db, quiz=quiz, creator_id=current_user.id)
@@ -340,14 +494,14 @@ def create_quiz(
 def read_quizzes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     return crud.get_quizzes(db, skip=skip, limit=limit)
 
 @app.get("/quizzes/{quiz_id}")
 def read_quiz(
     quiz_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get quiz with properly serialized questions"""
     quiz = crud.get_quiz_with_questions(db, quiz_id=quiz_id)
@@ -360,7 +514,7 @@ def read_quiz(
 def update_quiz(
     quiz_id: int,
     quiz: schemas.QuizUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
     db_quiz = crud.update_quiz(db, quiz_id=quiz_id, quiz=quiz)
@@ -371,7 +525,7 @@ def update_quiz(
 @app.delete("/quizzes/{quiz_id}")
 def delete_quiz(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.require_admin)
 ):
     db_quiz = crud.delete_quiz(db, quiz_id=quiz_id)
@@ -383,19 +537,27 @@ def delete_quiz(
 @app.post("/quiz-scores", response_model=schemas.QuizScoreResponse)
 def submit_quiz_score(
     quiz_score: schemas.QuizScoreCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    """Submit/Update a quiz completion score"""
-    logger.info(f"Quiz score submission: user={current_user.id}, quiz={quiz_score.quiz_id}")
+    """Submit/Update a quiz completion score
+
+    The score is graded on the server from the user's stored answers; the
+    score fields sent by the client are ignored.
+    """
+    logger.debug("quiz score submitted", extra={"user_id": current_user.id, "quiz_id": quiz_score.quiz_id})
+    
+    graded = crud.grade_quiz_from_answers(db, user_id=current_user.id, quiz_id=quiz_score.quiz_id)
+    if graded is None:
+        raise HTTPException(status_code=404, detail="Quiz not found or has no questions")
     
     result = crud.create_quiz_score(
         db=db, 
         user_id=current_user.id,
         quiz_id=quiz_score.quiz_id,
-        score=quiz_score.score,
-        total_questions=quiz_score.total_questions,
-        correct_answers=quiz_score.correct_answers
+        score=graded["score"],
+        total_questions=graded["total_questions"],
+        correct_answers=graded["correct_answers"]
     )
     
     if not result:
@@ -405,7 +567,7 @@ def submit_quiz_score(
 
 @app.get("/my-quiz-scores", response_model=List[schemas.QuizScoreResponse])
 def get_my_quiz_scores(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     """Get all quiz scores for the current user"""
@@ -414,15 +576,50 @@ def get_my_quiz_scores(
 @app.get("/quiz-scores/{quiz_id}", response_model=List[schemas.QuizScoreResponse])
 def get_quiz_leaderboard(
     quiz_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get leaderboard for a specific quiz"""
     return crud.get_quiz_scores(db, quiz_id=quiz_id)
 
+@app.get("/quiz-scores/{quiz_id}/top", response_model=schemas.LeaderboardPage)
+def get_quiz_leaderboard_top(
+    quiz_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    db: Session = Depends(get_read_db)
+):
+    """Get a page of the ranked leaderboard for a specific quiz"""
+    return leaderboard.get_top(db, quiz_id=quiz_id, skip=max(0, skip), limit=max(0, min(limit, 100)))
+
+@app.get("/quiz-scores/{quiz_id}/me", response_model=schemas.LeaderboardEntry)
+def get_my_quiz_rank(
+    quiz_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Get current user's rank on a quiz leaderboard"""
+    entry = leaderboard.get_user_rank(db, quiz_id=quiz_id, user_id=current_user.id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Quiz score not found")
+    return entry
+
+@app.get("/quiz-scores/{quiz_id}/around-me", response_model=schemas.LeaderboardPage)
+def get_quiz_leaderboard_around_me(
+    quiz_id: int,
+    radius: int = 5,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Get the leaderboard entries just above and below the current user"""
+    page = leaderboard.get_around_user(db, quiz_id=quiz_id, user_id=current_user.id, radius=max(0, min(radius, 50)))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Quiz score not found")
+    return page
+
 @app.get("/my-quiz-score/{quiz_id}", response_model=schemas.QuizScoreResponse)
 def get_my_quiz_score(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     """Get user's score for a specific quiz"""
@@ -434,7 +631,7 @@ def get_my_quiz_score(
 @app.delete("/my-quiz-score/{quiz_id}")
 def reset_my_quiz_score(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     """Reset user's quiz score (for complete retake)"""
@@ -473,19 +670,12 @@ async def options_users():
     return {}
 
 @app.on_event("startup")
-def create_admin_user():
-    db = next(get_db())
-    admin = crud.get_user_by_username(db, "admin")
-    if not admin:
-        from schemas import UserCreate
-        admin_user = UserCreate(
-            username="admin",
-            email="admin@example.com",
-            password="admin123",  
-            role="admin"
-        )
-        crud.create_user(db, admin_user)
-        logger.info("Admin user created.")
+def start_password_pool():
+    password_pool.start()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,184 @@
+import argparse
+import getpass
+import os
+import sys
+
+from database import SessionLocal
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def reconcile_stats(args):
+    import stats
+
+    db = SessionLocal()
+    try:
+        counters = stats.reconcile(db)
+        print(f"Rebuilt {counters} answer statistics counters")
+    finally:
+        db.close()
+
+
+def run_migrations(revision: str = "head"):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, revision)
+
+
+def migrate(args):
+    run_migrations(args.revision)
+
+
+def init_db(args):
+    """Bring the schema up to date and build the answer counters if they are missing"""
+    import stats
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        stats.ensure_initialized(db)
+    finally:
+        db.close()
+    print("Database is ready")
+
+
+def create_admin(args):
+    import crud
+    import schemas
+
+    password = args.password or os.getenv("ADMIN_PASSWORD") or getpass.getpass("Admin password: ")
+    db = SessionLocal()
+    try:
+        if crud.get_user_by_username(db, args.username):
+            print(f"User {args.username} already exists")
+            return
+        crud.create_user(db, schemas.UserCreate(
+            username=args.username, email=args.email, password=password, role="admin"
+        ))
+        print(f"Admin user {args.username} created")
+    finally:
+        db.close()
+
+
+def import_questions(args):
+    import question_import
+    from database import User
+
+    try:
+        with open(args.path, "rb") as f:
+            records = question_import.load(f.read(), question_import.detect_format(args.path, args.format))
+    except (OSError, question_import.ImportFormatError) as e:
+        print(f"Cannot import {args.path}: {e}")
+        sys.exit(2)
+
+    db = SessionLocal()
+    try:
+        creator = db.query(User).filter(
+            User.username == args.creator if args.creator else User.role == "admin"
+        ).order_by(User.id).first()
+        if creator is None:
+            print(f"No user {args.creator!r}" if args.creator else "No admin user; run create-admin or pass --creator")
+            sys.exit(2)
+        creator_name = creator.username
+        result = question_import.import_questions(db, records, creator_id=creator.id, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Imported {result['created']} questions as {creator_name}; {result['failed']} rows failed")
+    for error in result["errors"]:
+        print(f"  row {error['row']}: {'; '.join(error['errors'])}")
+    if result["failed"]:
+        sys.exit(1)
+
+
+def hot_queries():
+    """(name, statement) for the query shapes the request paths run most"""
+    from sqlalchemy import desc, func, select
+    from database import Answer, Choice, QuizQuestion, QuizScore, User
+
+    return [
+        ("answer for user and question", select(Answer).where(Answer.user_id == 1, Answer.question_id == 1)),
+        ("answers of a user", select(Answer.id, func.coalesce(Choice.is_correct, False)).outerjoin(
+            Choice, Choice.id == Answer.choice_id
+        ).where(Answer.user_id == 1).order_by(Answer.id)),
+        ("quiz score for user and quiz", select(QuizScore).where(QuizScore.user_id == 1, QuizScore.quiz_id == 1)),
+        ("quiz scores of a user", select(QuizScore).where(QuizScore.user_id == 1)),
+        ("quiz leaderboard", select(QuizScore.user_id, QuizScore.score).where(
+            QuizScore.quiz_id == 1
+        ).order_by(desc(QuizScore.score)).limit(10)),
+        ("choices of a question", select(Choice).where(Choice.question_id == 1)),
+        ("quizzes containing a question", select(QuizQuestion.quiz_id).where(QuizQuestion.question_id == 1)),
+        ("questions of a quiz", select(QuizQuestion.question_id).where(QuizQuestion.quiz_id == 1)),
+        ("global leaderboard", select(User.id, User.username, User.total_score).order_by(
+            desc(User.total_score), desc(User.id)
+        ).limit(20)),
+        ("user by username", select(User).where(User.username == "admin")),
+    ]
+
+
+def check_indexes(args):
+    """Fail if any hot query needs a full table scan (SQLite EXPLAIN QUERY PLAN)"""
+    from sqlalchemy import text
+    from database import engine
+
+    if engine.dialect.name != "sqlite":
+        print(f"check-indexes reads SQLite query plans; {engine.dialect.name} is not supported")
+        sys.exit(2)
+
+    failures = 0
+    with engine.connect() as connection:
+        for name, statement in hot_queries():
+            sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[3] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            scans = [step for step in plan if step.startswith("SCAN") and " USING " not in step]
+            failures += bool(scans)
+            print(f"{'FAIL' if scans else 'ok  '}  {name}: {' | '.join(plan)}")
+    if failures:
+        print(f"{failures} hot queries scan a table; run 'python manage.py migrate'")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuizKi management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "reconcile-stats", help="Rebuild the admin dashboard answer counters from the answers table"
+    ).set_defaults(func=reconcile_stats)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply database migrations (alembic upgrade)")
+    migrate_parser.add_argument("revision", nargs="?", default="head", help="Target revision (default: head)")
+    migrate_parser.set_defaults(func=migrate)
+
+    subparsers.add_parser(
+        "init-db", help="Create or upgrade the schema and build the answer counters"
+    ).set_defaults(func=init_db)
+
+    admin_parser = subparsers.add_parser("create-admin", help="Create an admin user if it does not exist yet")
+    admin_parser.add_argument("--username", default="admin")
+    admin_parser.add_argument("--email", default="admin@example.com")
+    admin_parser.add_argument("--password", help="Defaults to $ADMIN_PASSWORD, otherwise prompted for")
+    admin_parser.set_defaults(func=create_admin)
+
+    import_parser = subparsers.add_parser(
+        "import-questions", help="Bulk-create questions from a JSON or CSV question bank"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["json", "csv"], help="Defaults to the file extension")
+    import_parser.add_argument("--creator", help="Username recorded as the creator (default: the first admin)")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Questions per transaction")
+    import_parser.set_defaults(func=import_questions)
+
+    subparsers.add_parser(
+        "check-indexes", help="Check with EXPLAIN QUERY PLAN that every hot query uses an index"
+    ).set_defaults(func=check_indexes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
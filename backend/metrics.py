@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import event
+
+# Metrics Configuration
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Requests running more SQL statements than this are counted and logged (likely N+1 queries)
+METRICS_STATEMENT_THRESHOLD = int(os.getenv("METRICS_STATEMENT_THRESHOLD", "25"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    """SQL work done on behalf of one request, filled in by the engine event hooks"""
+
+    __slots__ = ("statements", "sql_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+current_request = contextvars.ContextVar("current_request_metrics", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set, rendered in the Prometheus text format"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...], label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self.series.items()]
+        for labels, series in sorted(items):
+            label_text = format_labels(self.label_names, labels)
+            prefix = label_text[:-1] + "," if label_text else "{"
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{prefix}le="{bound}"}} {cumulative}'
+            yield f'{self.name}_bucket{prefix}le="+Inf"}} {series[-1]}'
+            yield f"{self.name}_sum{label_text} {series[-2]}"
+            yield f"{self.name}_count{label_text} {series[-1]}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float, *labels):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            yield f"{self.name}{format_labels(self.label_names, labels)} {value}"
+
+
+def format_labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_samples(name: str, metric_type: str, help_text: str, samples):
+    """Render values read from elsewhere at scrape time; samples are (labels dict, value)"""
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} {metric_type}"
+    for labels, value in samples:
+        yield f"{name}{format_labels(tuple(labels), tuple(labels.values()))} {value}"
+
+
+request_duration = Histogram(
+    "quizki_http_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS, ("method", "route")
+)
+requests_total = Counter("quizki_http_requests_total", "Requests by route and status", ("method", "route", "status"))
+sql_statements = Histogram(
+    "quizki_sql_statements_per_request", "SQL statements executed per request", STATEMENT_BUCKETS, ("method", "route")
+)
+sql_seconds = Counter("quizki_sql_seconds_total", "Time spent executing SQL, by route", ("method", "route"))
+statement_threshold_exceeded = Counter(
+    "quizki_requests_over_statement_threshold_total",
+    "Requests that ran more SQL statements than METRICS_STATEMENT_THRESHOLD",
+    ("method", "route"),
+)
+password_duration = Histogram(
+    "quizki_password_hash_seconds", "bcrypt time per password operation, excluding queueing", LATENCY_BUCKETS,
+    ("operation",)
+)
+_in_progress = 0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement even when it raises
+    if current_request.get() is not None and context is not None:
+        context._quizki_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request_metrics = current_request.get()
+    if request_metrics is None:
+        return
+    started = getattr(context, "_quizki_query_start", None)
+    if started is not None:
+        request_metrics.sql_seconds += time.perf_counter() - started
+    request_metrics.statements += 1
+
+
+def instrument_engine(engine):
+    """Count statements and SQL time of the current request on this engine"""
+    if METRICS_ENABLED:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL work per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        global _in_progress
+        request_metrics = RequestMetrics()
+        token = current_request.set(request_metrics)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        _in_progress += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_progress -= 1
+            current_request.reset(token)
+            elapsed = time.perf_counter() - started
+            # The route template, not the raw path, so /quizzes/1 and /quizzes/2 share a series
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            request_duration.observe(elapsed, method, route)
+            requests_total.inc(1, method, route, status["code"])
+            sql_statements.observe(request_metrics.statements, method, route)
+            sql_seconds.inc(request_metrics.sql_seconds, method, route)
+            if request_metrics.statements > METRICS_STATEMENT_THRESHOLD:
+                statement_threshold_exceeded.inc(1, method, route)
+                logger.warning("request exceeded SQL statement threshold", extra={
+                    "method": method, "route": route, "path": scope["path"], "statements": request_metrics.statements,
+                    "sql_ms": round(request_metrics.sql_seconds * 1000, 2), "threshold": METRICS_STATEMENT_THRESHOLD,
+                })
+
+
+def _cache_samples():
+    import auth
+    import grading
+    from cache import payload_cache
+
+    return {
+        "payload": payload_cache.stats(),
+        "auth_user": auth.user_cache.stats(),
+        "token": auth.token_cache.stats(),
+        "answer_key": grading.stats(),
+    }
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    from passwords import password_pool
+
+    lines = []
+    for metric in (request_duration, requests_total, sql_statements, sql_seconds, statement_threshold_exceeded):
+        lines.extend(metric.render())
+    lines.extend(render_samples(
+        "quizki_http_requests_in_progress", "gauge", "Requests currently being handled", [({}, _in_progress)]
+    ))
+
+    caches = _cache_samples()
+    lines.extend(render_samples(
+        "quizki_cache_hits_total", "counter", "Cache lookups served from the cache",
+        [({"cache": name}, cache_stats["hits"]) for name, cache_stats in caches.items()]
+    ))
+    lines.extend(render_samples(
+        "quizki_cache_misses_total", "counter", "Cache lookups that had to load",
+        [({"cache": name}, cache_stats["misses"]) for name, cache_stats in caches.items()]
+    ))
+    lines.extend(render_samples(
+        "quizki_cache_entries", "gauge", "Entries currently cached",
+        [({"cache": name}, cache_stats["entries"]) for name, cache_stats in caches.items() if "entries" in cache_stats]
+    ))
+
+    lines.extend(password_duration.render())
+    lines.extend(render_samples(
+        "quizki_password_wait_seconds_total", "counter", "Time password operations waited for a pool slot",
+        [({}, password_pool.wait_seconds)]
+    ))
+    lines.extend(render_samples(
+        "quizki_password_rejected_total", "counter", "Password operations rejected because the queue was full",
+        [({}, password_pool.rejected)]
+    ))
+    lines.extend(render_samples(
+        "quizki_password_queued", "gauge", "Password operations waiting for a pool slot", [({}, password_pool.queued)]
+    ))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,163 @@
+"""Baseline schema
+
+Creates the schema as it stood before migrations were introduced. Databases
+that were created by Base.metadata.create_all already have some or all of it,
+so every table and index is only created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # Offline (--sql) runs cannot inspect the database and emit the full schema
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _create_index(name, table, columns, unique=False):
+    existing = set() if context.is_offline_mode() else {
+        index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)
+    }
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade():
+    if not _has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("total_score", sa.Float(), nullable=True),
+            sa.Column("role", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_users_id", "users", ["id"])
+    _create_index("ix_users_username", "users", ["username"], unique=True)
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+    _create_index("ix_users_total_score_id", "users", ["total_score", "id"])
+
+    if not _has_table("questions"):
+        op.create_table(
+            "questions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("question_text", sa.Text(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+            sa.Column("creator_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["creator_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_questions_id", "questions", ["id"])
+
+    if not _has_table("quizzes"):
+        op.create_table(
+            "quizzes",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("category", sa.String(), nullable=True),
+            sa.Column("difficulty", sa.String(), nullable=True),
+            sa.Column("time_limit", sa.Integer(), nullable=True),
+            sa.Column("creator_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["creator_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_quizzes_id", "quizzes", ["id"])
+
+    if not _has_table("choices"):
+        op.create_table(
+            "choices",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("choice_text", sa.Text(), nullable=False),
+            sa.Column("question_id", sa.Integer(), nullable=True),
+            sa.Column("is_correct", sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_choices_id", "choices", ["id"])
+
+    if not _has_table("answers"):
+        op.create_table(
+            "answers",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("question_id", sa.Integer(), nullable=False),
+            sa.Column("choice_id", sa.Integer(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["choice_id"], ["choices.id"]),
+            sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_answers_id", "answers", ["id"])
+
+    if not _has_table("quiz_questions"):
+        op.create_table(
+            "quiz_questions",
+            sa.Column("quiz_id", sa.Integer(), nullable=False),
+            sa.Column("question_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("quiz_id", "question_id"),
+        )
+
+    if not _has_table("quiz_scores"):
+        op.create_table(
+            "quiz_scores",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("quiz_id", sa.Integer(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("total_questions", sa.Integer(), nullable=True),
+            sa.Column("correct_answers", sa.Integer(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    _create_index("ix_quiz_scores_id", "quiz_scores", ["id"])
+    _create_index("ix_quiz_scores_quiz_id_score", "quiz_scores", ["quiz_id", "score"])
+
+    if not _has_table("answer_stats"):
+        op.create_table(
+            "answer_stats",
+            sa.Column("scope", sa.String(), nullable=False),
+            sa.Column("key", sa.String(), nullable=False),
+            sa.Column("total", sa.Integer(), nullable=False),
+            sa.Column("correct", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("scope", "key"),
+        )
+
+    if not _has_table("user_token_versions"):
+        op.create_table(
+            "user_token_versions",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+
+def downgrade():
+    for table in (
+        "user_token_versions", "answer_stats", "quiz_scores", "quiz_questions",
+        "answers", "choices", "quizzes", "questions", "users",
+    ):
+        op.drop_table(table)
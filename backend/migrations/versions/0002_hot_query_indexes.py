@@ -0,0 +1,68 @@
+"""Indexes and uniqueness for the hot query shapes
+
+- answers (user_id, question_id), unique: one answer per user and question
+- quiz_scores (user_id, quiz_id), unique: one score per user and quiz
+- choices (question_id)
+- quiz_questions (question_id)
+
+quiz_scores (quiz_id, score) for the per-quiz leaderboards is already part of
+the baseline. The unique indexes refuse to build over duplicate rows, so the
+upgrade stops with a list of them instead of deleting anything.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("uq_answers_user_id_question_id", "answers", ["user_id", "question_id"], True),
+    ("uq_quiz_scores_user_id_quiz_id", "quiz_scores", ["user_id", "quiz_id"], True),
+    ("ix_choices_question_id", "choices", ["question_id"], False),
+    ("ix_quiz_questions_question_id", "quiz_questions", ["question_id"], False),
+]
+
+
+def _existing_indexes(table):
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _check_duplicates(table, columns):
+    if context.is_offline_mode():
+        return
+    column_list = ", ".join(columns)
+    not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT {column_list}, COUNT(*) FROM {table} WHERE {not_null} "
+        f"GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 10"
+    )).all()
+    if duplicates:
+        rows = "; ".join(", ".join(str(value) for value in row[:-1]) + f" ({row[-1]} rows)" for row in duplicates)
+        raise RuntimeError(
+            f"Cannot add a unique index on {table} ({column_list}): duplicate rows exist, e.g. {rows}. "
+            f"Remove the duplicates and run the migration again."
+        )
+
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        if name in _existing_indexes(table):
+            continue
+        if unique:
+            _check_duplicates(table, columns)
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,41 @@
+"""Record on every answer whether it was correct when it was given
+
+answers.is_correct is what the answer counters were incremented with, so
+removing an answer decrements them by the same amount even after the
+question's correct choice has been changed. Existing answers are backfilled
+from their choice's current correctness, the best information available.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    if context.is_offline_mode():
+        return False
+    return column in {existing["name"] for existing in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if _has_column("answers", "is_correct"):
+        return
+    op.add_column("answers", sa.Column("is_correct", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute(
+        "UPDATE answers SET is_correct = COALESCE("
+        "(SELECT choices.is_correct FROM choices WHERE choices.id = answers.choice_id), is_correct)"
+    )
+
+
+def downgrade():
+    if _has_column("answers", "is_correct"):
+        with op.batch_alter_table("answers") as batch:
+            batch.drop_column("is_correct")
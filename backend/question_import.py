@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import schemas
+from cache import payload_cache, quiz_namespace, QUIZ_LIST_NAMESPACE
+from database import Choice, Question, Quiz, QuizQuestion
+
+# Questions per transaction; each batch is three executemany statements and one commit
+IMPORT_BATCH_SIZE = 1000
+
+FORMATS = ("json", "csv")
+
+CSV_HELP = "question_text, score, choice_1 ... choice_N, correct (choice numbers, e.g. 2 or 1;3) and optional quiz_ids"
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be read as a question bank at all, as opposed to a single bad row"""
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    fmt = (fmt or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return [item for item in re.split(r"[;,\s]+", value or "") if item]
+
+
+def parse_json(text: str) -> List[Tuple[object, List[str]]]:
+    """A list of questions, or {"questions": [...]}, in the POST /questions shape plus optional quiz_ids"""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ImportFormatError(f"Invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list):
+        raise ImportFormatError('Expected a list of questions or {"questions": [...]}')
+    return [(record, []) for record in data]
+
+
+def parse_csv(text: str) -> List[Tuple[object, List[str]]]:
+    """One question per row; blank choice cells are skipped"""
+    reader = csv.DictReader(io.StringIO(text))
+    columns = reader.fieldnames or []
+    choice_columns = [column for column in columns if column.startswith("choice_")]
+    if "question_text" not in columns or not choice_columns:
+        raise ImportFormatError(f"CSV needs a header row with {CSV_HELP}")
+    bad_columns = [column for column in choice_columns if not column[len("choice_"):].isdigit()]
+    if bad_columns:
+        raise ImportFormatError(f"Choice columns must be named choice_1, choice_2, ...; got {', '.join(bad_columns)}")
+
+    records = []
+    for row in reader:
+        numbers = {column: column[len("choice_"):] for column in choice_columns if (row.get(column) or "").strip()}
+        correct = _split_list(row.get("correct"))
+        errors = [f"correct: there is no choice {number}" for number in correct if number not in numbers.values()]
+        record = {
+            "question_text": row.get("question_text"),
+            "score": row.get("score"),
+            "choices": [
+                {"choice_text": row[column].strip(), "is_correct": number in correct}
+                for column, number in numbers.items()
+            ],
+            "quiz_ids": _split_list(row.get("quiz_ids")),
+        }
+        records.append((record, errors))
+    return records
+
+
+def load(content: bytes, fmt: str) -> List[Tuple[object, List[str]]]:
+    """Parse a question bank into (record, parse errors) pairs"""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFormatError("The file must be UTF-8 encoded")
+    return parse_csv(text) if fmt == "csv" else parse_json(text)
+
+
+def _validate(records, known_quiz_ids) -> Tuple[List[Tuple[int, schemas.QuestionImportItem]], List[dict]]:
+    valid = []
+    errors = []
+    for row, (record, problems) in enumerate(records, start=1):
+        if problems:
+            errors.append({"row": row, "errors": problems})
+            continue
+        problems = []
+        try:
+            item = schemas.QuestionImportItem.model_validate(record)
+        except ValidationError as e:
+            errors.append({"row": row, "errors": [
+                f"{'.'.join(str(part) for part in error['loc']) or 'question'}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+
+        if not item.question_text.strip():
+            problems.append("question_text: must not be empty")
+        if item.score < 0:
+            problems.append("score: must not be negative")
+        if len(item.choices) < 2:
+            problems.append("choices: at least two choices are required")
+        if not any(choice.is_correct for choice in item.choices):
+            problems.append("choices: at least one choice must be correct")
+        unknown = sorted(set(item.quiz_ids) - known_quiz_ids)
+        if unknown:
+            problems.append(f"quiz_ids: no quiz with id {', '.join(map(str, unknown))}")
+        if problems:
+            errors.append({"row": row, "errors": problems})
+        else:
+            valid.append((row, item))
+    return valid, errors
+
+
+def _batches(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _referenced_quiz_ids(records) -> set:
+    quiz_ids = set()
+    for record, _ in records:
+        if isinstance(record, dict) and isinstance(record.get("quiz_ids"), list):
+            quiz_ids.update(quiz_id for quiz_id in record["quiz_ids"] if str(quiz_id).isdigit())
+    return {int(quiz_id) for quiz_id in quiz_ids}
+
+
+def import_questions(db: Session, records, creator_id: int, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """Validate every record, then insert the valid ones in batches
+
+    Invalid rows are reported and skipped without affecting the others. A
+    batch that fails in the database is rolled back and its rows reported.
+    """
+    referenced = _referenced_quiz_ids(records)
+    known_quiz_ids = set(db.scalars(select(Quiz.id).where(Quiz.id.in_(referenced)))) if referenced else set()
+    valid, errors = _validate(records, known_quiz_ids)
+
+    question_ids = []
+    touched_quizzes = set()
+    for batch in _batches(valid, batch_size):
+        try:
+            ids = db.scalars(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                [{"question_text": item.question_text, "score": item.score, "creator_id": creator_id} for _, item in batch]
+            ).all()
+            db.execute(insert(Choice), [
+                {"question_id": question_id, "choice_text": choice.choice_text, "is_correct": choice.is_correct}
+                for question_id, (_, item) in zip(ids, batch) for choice in item.choices
+            ])
+            links = [
+                {"quiz_id": quiz_id, "question_id": question_id}
+                for question_id, (_, item) in zip(ids, batch) for quiz_id in dict.fromkeys(item.quiz_ids)
+            ]
+            if links:
+                db.execute(insert(QuizQuestion), links)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            message = f"database: {getattr(e, 'orig', None) or e}"
+            errors.extend({"row": row, "errors": [message]} for row, _ in batch)
+            continue
+        question_ids.extend(ids)
+        touched_quizzes.update(link["quiz_id"] for link in links)
+
+    # New questions change the quizzes they joined (lists, details and answer keys)
+    if touched_quizzes:
+        payload_cache.invalidate(QUIZ_LIST_NAMESPACE, *(quiz_namespace(quiz_id) for quiz_id in sorted(touched_quizzes)))
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "created": len(question_ids),
+        "failed": len(errors),
+        "question_ids": question_ids,
+        "errors": errors,
+    }
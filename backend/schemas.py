@@ -62,6 +62,35 @@ class QuestionResponse(QuestionBase):
 class QuestionCreateWithChoices(QuestionBase):
     choices: List[ChoiceCreate]
 
+class ChoiceUpdate(ChoiceBase):
+    id: Optional[int] = None  # keep this existing choice; without an id a choice with the same text is kept
+
+class QuestionUpdate(QuestionBase):
+    choices: List[ChoiceUpdate]
+
+class QuestionChanges(BaseModel):
+    fields: List[str]
+    choices_added: List[int]
+    choices_updated: List[int]
+    choices_removed: List[int]
+
+class QuestionUpdateResponse(QuestionResponse):
+    changes: QuestionChanges
+
+# Bulk question import
+class QuestionImportItem(QuestionCreateWithChoices):
+    quiz_ids: List[int] = []
+
+class QuestionImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class QuestionImportResult(BaseModel):
+    created: int
+    failed: int
+    question_ids: List[int]
+    errors: List[QuestionImportError]
+
 # Answer Schemas
 class AnswerCreate(BaseModel):
     question_id: int
@@ -126,6 +155,9 @@ class QuizDetailResponse(BaseModel):
         arbitrary_types_allowed = True
 
 # Auth Schemas
+class UserRoleUpdate(BaseModel):
+    role: str
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -154,3 +186,43 @@ class QuizScoreResponse(QuizScoreBase):
     
     class Config:
         from_attributes = True
+
+# Quiz Attempt Schemas
+class QuizAttemptCreate(BaseModel):
+    answers: List[AnswerCreate]
+
+class QuizAttemptResponse(BaseModel):
+    quiz_id: int
+    score: float
+    total_questions: int
+    correct_answers: int
+    quiz_score: QuizScoreResponse
+    answers: List[AnswerResponse]
+
+# Leaderboard Schemas
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    quiz_id: int
+    score: float
+    total_questions: int
+    correct_answers: int
+    completed_at: datetime
+
+class LeaderboardPage(BaseModel):
+    quiz_id: int
+    total: int
+    entries: List[LeaderboardEntry]
+
+class UserRankEntry(BaseModel):
+    rank: int
+    username: str
+    total_score: float
+
+class UserLeaderboardPage(BaseModel):
+    entries: List[UserRankEntry]
+    next_cursor: Optional[str] = None
+
+class UserRankResponse(UserRankEntry):
+    user_id: int
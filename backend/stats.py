@@ -0,0 +1,190 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Tuple
+
+from sqlalchemy import String, case, cast, func
+from sqlalchemy.orm import Session
+
+from database import Answer, AnswerStat, Question, Quiz, QuizQuestion
+
+# Counter scopes kept in the answer_stats table
+GLOBAL = "global"
+QUIZ = "quiz"
+QUESTION = "question"
+DAY = "day"
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(AnswerStat)
+
+
+def _apply_deltas(db: Session, deltas: dict):
+    """Add (total, correct) deltas to counters with one multi-row upsert"""
+    rows = [
+        {"scope": scope, "key": key, "total": total, "correct": correct}
+        for (scope, key), (total, correct) in deltas.items()
+        if total or correct
+    ]
+    if not rows:
+        return
+    stmt = _insert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AnswerStat.scope, AnswerStat.key],
+        set_={
+            "total": AnswerStat.total + stmt.excluded.total,
+            "correct": AnswerStat.correct + stmt.excluded.correct,
+        }
+    )
+    db.execute(stmt, rows)
+
+
+def record_answer_changes(db: Session, changes: Iterable[Tuple[int, datetime, bool, int]]):
+    """Update the counters for answers added (delta=+1) or removed (delta=-1)
+
+    changes holds (question_id, created_at, is_correct, delta) tuples. Runs in
+    the caller's transaction, so the counters commit together with the answers.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    question_ids = {question_id for question_id, _, _, _ in changes}
+    quizzes_by_question = defaultdict(list)
+    for quiz_id, question_id in db.query(QuizQuestion.quiz_id, QuizQuestion.question_id).filter(
+        QuizQuestion.question_id.in_(question_ids)
+    ).all():
+        quizzes_by_question[question_id].append(quiz_id)
+
+    deltas = defaultdict(lambda: [0, 0])
+    for question_id, created_at, is_correct, delta in changes:
+        correct = delta if is_correct else 0
+        keys = [(GLOBAL, "all"), (QUESTION, str(question_id)), (DAY, (created_at or datetime.utcnow()).date().isoformat())]
+        keys += [(QUIZ, str(quiz_id)) for quiz_id in quizzes_by_question[question_id]]
+        for key in keys:
+            deltas[key][0] += delta
+            deltas[key][1] += correct
+    _apply_deltas(db, deltas)
+
+
+def record_quiz_links(db: Session, quiz_id: int, added: Iterable[int] = (), removed: Iterable[int] = ()):
+    """Move the answers of questions linked to or unlinked from a quiz into or out of its counter
+
+    A quiz counts every answer to its current questions, so linking a question
+    that already has answers adds its counter to the quiz's. Runs in the
+    caller's transaction.
+    """
+    signs = {str(question_id): 1 for question_id in added}
+    signs.update({str(question_id): -1 for question_id in removed})
+    if not signs:
+        return
+    total = correct = 0
+    for stat in db.query(AnswerStat).filter(AnswerStat.scope == QUESTION, AnswerStat.key.in_(signs.keys())):
+        total += signs[stat.key] * stat.total
+        correct += signs[stat.key] * stat.correct
+    _apply_deltas(db, {(QUIZ, str(quiz_id)): [total, correct]})
+
+
+def forget_quiz(db: Session, quiz_id: int):
+    """Drop a deleted quiz's counter so a quiz that reuses its id starts from zero
+
+    Runs in the caller's transaction.
+    """
+    db.query(AnswerStat).filter(AnswerStat.scope == QUIZ, AnswerStat.key == str(quiz_id)).delete()
+
+
+def reconcile(db: Session):
+    """Rebuild every counter from the answers table and commit"""
+    # The correctness recorded with each answer, which is what the running counters add up
+    is_correct = case((Answer.is_correct == True, 1), else_=0)  # noqa: E712
+    valid = (Answer.question_id.isnot(None), Answer.choice_id.isnot(None))
+
+    def aggregate(*group_by):
+        query = db.query(*group_by, func.count(Answer.id), func.sum(is_correct)).filter(*valid)
+        return query.group_by(*group_by).all() if group_by else query.all()
+
+    rows = []
+    for total, correct in aggregate():
+        rows.append({"scope": GLOBAL, "key": "all", "total": total or 0, "correct": correct or 0})
+    for question_id, total, correct in aggregate(Answer.question_id):
+        rows.append({"scope": QUESTION, "key": str(question_id), "total": total, "correct": correct or 0})
+    for day, total, correct in aggregate(func.date(Answer.created_at)):
+        rows.append({"scope": DAY, "key": str(day), "total": total, "correct": correct or 0})
+
+    per_quiz = db.query(QuizQuestion.quiz_id, func.count(Answer.id), func.sum(is_correct)).join(
+        Answer, Answer.question_id == QuizQuestion.question_id
+    ).filter(*valid).group_by(QuizQuestion.quiz_id).all()
+    for quiz_id, total, correct in per_quiz:
+        rows.append({"scope": QUIZ, "key": str(quiz_id), "total": total, "correct": correct or 0})
+
+    db.query(AnswerStat).delete()
+    if rows:
+        db.execute(_insert(db), rows)
+    db.commit()
+    return len(rows)
+
+
+def ensure_initialized(db: Session):
+    """Build the counters once for databases that predate them"""
+    if db.get(AnswerStat, (GLOBAL, "all")) is None:
+        reconcile(db)
+
+
+def _accuracy(total: int, correct: int) -> int:
+    return round(correct * 100 / total) if total > 0 else 0
+
+
+def get_summary(db: Session, days: int = 30):
+    """Dashboard statistics read from the counters (no scan of the answers table)"""
+    overall = db.get(AnswerStat, (GLOBAL, "all"))
+    total = overall.total if overall else 0
+    correct = overall.correct if overall else 0
+
+    since = (datetime.utcnow() - timedelta(days=days - 1)).date().isoformat()
+    per_day = db.query(AnswerStat).filter(AnswerStat.scope == DAY, AnswerStat.key >= since).order_by(AnswerStat.key).all()
+    per_quiz = db.query(AnswerStat, Quiz.title).join(
+        Quiz, AnswerStat.key == cast(Quiz.id, String)
+    ).filter(AnswerStat.scope == QUIZ).all()
+
+    return {
+        "total_answers": total,
+        "correct_answers": correct,
+        "average_score": _accuracy(total, correct),
+        "per_quiz": [
+            {
+                "quiz_id": int(stat.key),
+                "title": title,
+                "total_answers": stat.total,
+                "correct_answers": stat.correct,
+                "accuracy": _accuracy(stat.total, stat.correct)
+            } for stat, title in sorted(per_quiz, key=lambda row: int(row[0].key))
+        ],
+        "per_day": [
+            {
+                "date": stat.key,
+                "total_answers": stat.total,
+                "correct_answers": stat.correct,
+                "accuracy": _accuracy(stat.total, stat.correct)
+            } for stat in per_day
+        ]
+    }
+
+
+def get_question_accuracy(db: Session):
+    """Per-question answer counts and accuracy, hardest questions first"""
+    rows = db.query(AnswerStat, Question.question_text).join(
+        Question, AnswerStat.key == cast(Question.id, String)
+    ).filter(AnswerStat.scope == QUESTION, AnswerStat.total > 0).all()
+    result = [
+        {
+            "question_id": int(stat.key),
+            "question_text": question_text,
+            "total_answers": stat.total,
+            "correct_answers": stat.correct,
+            "accuracy": _accuracy(stat.total, stat.correct)
+        } for stat, question_text in rows
+    ]
+    result.sort(key=lambda item: (item["accuracy"], item["question_id"]))
+    return result
@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+
+# Configure the app before any backend module reads its settings at import time
+_DATA_DIR = tempfile.mkdtemp(prefix="quizki-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_DATA_DIR}/quizki.db",
+    "ASYNC_DATABASE_URL": "",
+    "READ_REPLICA_URLS": "",
+    "CACHE_BACKEND": "memory",
+    "PASSWORD_WORKERS": "0",
+    "BCRYPT_ROUNDS": "4",
+    "LOG_QUEUE": "0",
+    "LOG_LEVEL": "WARNING",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import auth  # noqa: E402
+import crud  # noqa: E402
+import database  # noqa: E402
+import grading  # noqa: E402
+import leaderboard  # noqa: E402
+import manage  # noqa: E402
+import schemas  # noqa: E402
+from cache import payload_cache  # noqa: E402
+
+ADMIN_PASSWORD = "admin-password"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_db():
+    manage.run_migrations()
+    yield database.engine
+    database.engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clean_state(migrated_db):
+    """Empty every table and the in-process caches, so ids restart and nothing leaks between tests"""
+    with database.engine.begin() as connection:
+        for table in reversed(database.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    payload_cache.clear()
+    for entries in (grading._quiz_keys, grading._question_keys, leaderboard._boards,
+                    auth.user_cache._entries, auth.token_cache._entries):
+        entries.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client():
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def login(client, username: str, password: str) -> dict:
+    response = client.post("/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client, db):
+    crud.create_user(db, schemas.UserCreate(
+        username="admin", email="admin@example.com", password=ADMIN_PASSWORD, role="admin"
+    ))
+    return login(client, "admin", ADMIN_PASSWORD)
+
+
+@pytest.fixture
+def user_headers(client):
+    response = client.post("/register", json={"username": "player", "email": "player@example.com", "password": "player-password"})
+    assert response.status_code == 200, response.text
+    return login(client, "player", "player-password")
+
+
+def create_question(client, headers, text: str = "Question", score: float = 10.0, correct: int = 0, choices: int = 2) -> dict:
+    response = client.post("/questions", headers=headers, json={
+        "question_text": text,
+        "score": score,
+        "choices": [{"choice_text": f"Choice {i + 1}", "is_correct": i == correct} for i in range(choices)],
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_quiz(client, headers, question_ids, title: str = "Quiz") -> dict:
+    response = client.post("/quizzes", headers=headers, json={"title": title, "questions": list(question_ids)})
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,91 @@
+import threading
+
+import stats
+from database import Answer, AnswerStat, QuizScore, User
+
+from conftest import create_question, create_quiz
+
+THREADS = 8
+ROUNDS = 5
+
+
+def run_concurrently(func):
+    """Call func(thread_index, round) from THREADS threads, ROUNDS times each; return the responses"""
+    barrier = threading.Barrier(THREADS)
+    responses = []
+    lock = threading.Lock()
+
+    def worker(index):
+        for round_number in range(ROUNDS):
+            barrier.wait()
+            response = func(index, round_number)
+            with lock:
+                responses.append(response)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def assert_totals_consistent(db, user_id):
+    """The user's total equals their answer scores plus quiz scores, and the counters match a rebuild"""
+    db.expire_all()
+    answers = db.query(Answer).filter(Answer.user_id == user_id).all()
+    quiz_scores = db.query(QuizScore).filter(QuizScore.user_id == user_id).all()
+    user = db.get(User, user_id)
+    assert user.total_score == sum(answer.score for answer in answers) + sum(score.score for score in quiz_scores)
+    running = {(stat.scope, stat.key): (stat.total, stat.correct) for stat in db.query(AnswerStat) if stat.total}
+    stats.reconcile(db)
+    rebuilt = {(stat.scope, stat.key): (stat.total, stat.correct) for stat in db.query(AnswerStat) if stat.total}
+    assert running == rebuilt
+    return answers
+
+
+def test_concurrent_answers_to_the_same_question(client, admin_headers, user_headers, db):
+    question = create_question(client, admin_headers, correct=0, choices=2)
+    choice_ids = [choice["id"] for choice in question["choices"]]
+
+    responses = run_concurrently(lambda index, _: client.post("/answers", headers=user_headers, json={
+        "question_id": question["id"], "choice_id": choice_ids[index % 2],
+    }))
+
+    assert sorted({response.status_code for response in responses}) == [200]
+    user_id = client.get("/me", headers=user_headers).json()["id"]
+    answers = assert_totals_consistent(db, user_id)
+    assert len(answers) == 1
+
+
+def test_concurrent_quiz_attempts(client, admin_headers, user_headers, db):
+    questions = [create_question(client, admin_headers, text=f"Q{i}", correct=0) for i in range(3)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+
+    responses = run_concurrently(lambda index, _: client.post(f"/quizzes/{quiz['id']}/attempts", headers=user_headers, json={
+        "answers": [{"question_id": question["id"], "choice_id": question["choices"][index % 2]["id"]} for question in questions]
+    }))
+
+    assert sorted({response.status_code for response in responses}) == [200]
+    user_id = client.get("/me", headers=user_headers).json()["id"]
+    answers = assert_totals_consistent(db, user_id)
+    assert len(answers) == len(questions)
+
+
+def test_concurrent_quiz_attempts_and_score_resets(client, admin_headers, user_headers, db):
+    questions = [create_question(client, admin_headers, text=f"Q{i}", correct=0) for i in range(2)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+
+    def attempt_or_reset(index, _):
+        if index % 2:
+            return client.delete(f"/my-quiz-score/{quiz['id']}", headers=user_headers)
+        return client.post(f"/quizzes/{quiz['id']}/attempts", headers=user_headers, json={
+            "answers": [{"question_id": question["id"], "choice_id": question["choices"][0]["id"]} for question in questions]
+        })
+
+    responses = run_concurrently(attempt_or_reset)
+
+    # A reset finding no score is a 404, never a failed write
+    assert {response.status_code for response in responses} <= {200, 404}
+    user_id = client.get("/me", headers=user_headers).json()["id"]
+    assert_totals_consistent(db, user_id)
@@ -0,0 +1,40 @@
+from database import Answer, QuizScore, User
+
+from conftest import create_question, create_quiz
+
+
+def test_quiz_attempt_replaces_previous_attempt(client, admin_headers, user_headers, db):
+    questions = [create_question(client, admin_headers, text=f"Q{i}", score=10.0, correct=0) for i in range(3)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+
+    def attempt(choice_index):
+        response = client.post(f"/quizzes/{quiz['id']}/attempts", headers=user_headers, json={
+            "answers": [{"question_id": question["id"], "choice_id": question["choices"][choice_index]["id"]} for question in questions]
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    first = attempt(0)
+    assert (first["correct_answers"], first["total_questions"]) == (3, 3)
+    board_before = client.get(f"/quiz-scores/{quiz['id']}/me", headers=user_headers).json()
+    assert board_before["score"] == first["score"]
+
+    second = attempt(1)
+
+    # The answers and the quiz score are replaced in place, not added
+    assert second["correct_answers"] == 0
+    assert [answer["id"] for answer in second["answers"]] == [answer["id"] for answer in first["answers"]]
+    assert second["quiz_score"]["id"] == first["quiz_score"]["id"]
+    assert all(answer["is_correct"] is False for answer in second["answers"])
+
+    user_id = client.get("/me", headers=user_headers).json()["id"]
+    db.expire_all()
+    answers = db.query(Answer).filter(Answer.user_id == user_id).all()
+    assert sorted(answer.choice_id for answer in answers) == sorted(question["choices"][1]["id"] for question in questions)
+    [quiz_score] = db.query(QuizScore).filter(QuizScore.user_id == user_id).all()
+    assert quiz_score.score == second["score"]
+    assert db.get(User, user_id).total_score == sum(answer.score for answer in answers) + quiz_score.score
+
+    board_after = client.get(f"/quiz-scores/{quiz['id']}/me", headers=user_headers).json()
+    assert board_after["score"] == second["score"]
+    assert client.get(f"/quiz-scores/{quiz['id']}/top").json()["total"] == 1
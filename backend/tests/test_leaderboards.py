@@ -0,0 +1,82 @@
+import crud
+import schemas
+from database import User
+
+from conftest import create_question, create_quiz, login
+
+# Seven players whose ranks are 1, 2, 2, 2, 5, 5, 7
+SCORES = [90.0, 80.0, 80.0, 80.0, 70.0, 70.0, 60.0]
+RANKS = [1, 2, 2, 2, 5, 5, 7]
+
+
+def seed_scores(client, admin_headers, db):
+    """Create a quiz and one player per score in SCORES; return the quiz and the players' usernames"""
+    question = create_question(client, admin_headers)
+    quiz = create_quiz(client, admin_headers, [question["id"]])
+    usernames = []
+    for number, score in enumerate(SCORES):
+        username = f"ranked{number}"
+        user = crud.create_user(db, schemas.UserCreate(
+            username=username, email=f"{username}@example.com", password=f"{username}-password"
+        ))
+        assert crud.create_quiz_score(db, user.id, quiz["id"], score, total_questions=1, correct_answers=1)
+        usernames.append(username)
+    return quiz, usernames
+
+
+def quiz_board_pages(client, quiz_id, limit):
+    entries = []
+    while True:
+        page = client.get(f"/quiz-scores/{quiz_id}/top?skip={len(entries)}&limit={limit}").json()
+        entries += page["entries"]
+        if len(entries) >= page["total"]:
+            return entries
+
+
+def test_quiz_leaderboard_ties_share_ranks_across_pages(client, admin_headers, db):
+    quiz, usernames = seed_scores(client, admin_headers, db)
+
+    entries = quiz_board_pages(client, quiz["id"], limit=2)
+
+    assert [entry["rank"] for entry in entries] == RANKS
+    assert [entry["score"] for entry in entries] == SCORES
+    # Tied players are listed by user id
+    assert [entry["username"] for entry in entries] == usernames
+
+
+def test_global_leaderboard_ties_share_ranks_across_keyset_pages(client, admin_headers, db):
+    seed_scores(client, admin_headers, db)
+
+    entries = []
+    cursor = None
+    while True:
+        url = "/leaderboard?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url).json()
+        entries += page["entries"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # The admin has no score and comes last
+    assert [entry["rank"] for entry in entries] == RANKS + [8]
+    assert [entry["total_score"] for entry in entries] == SCORES + [0.0]
+    for entry in entries:
+        if entry["username"].startswith("ranked"):
+            user_id = db.query(User.id).filter(User.username == entry["username"]).scalar()
+            assert client.get(f"/users/{user_id}/rank").json()["rank"] == entry["rank"]
+
+
+def test_quiz_leaderboard_after_score_deletion(client, admin_headers, db):
+    quiz, usernames = seed_scores(client, admin_headers, db)
+    # Build the in-process board before the deletion, so the deletion has to update it
+    assert [entry["rank"] for entry in quiz_board_pages(client, quiz["id"], limit=10)] == RANKS
+
+    headers = login(client, usernames[1], f"{usernames[1]}-password")
+    assert client.delete(f"/my-quiz-score/{quiz['id']}", headers=headers).status_code == 200
+
+    entries = quiz_board_pages(client, quiz["id"], limit=10)
+    assert [entry["username"] for entry in entries] == usernames[:1] + usernames[2:]
+    assert [entry["rank"] for entry in entries] == [1, 2, 2, 4, 4, 6]
+    assert client.get(f"/quiz-scores/{quiz['id']}/me", headers=headers).status_code == 404
+    last = login(client, usernames[-1], f"{usernames[-1]}-password")
+    assert client.get(f"/quiz-scores/{quiz['id']}/me", headers=last).json()["rank"] == 6
@@ -0,0 +1,26 @@
+from conftest import create_question, create_quiz
+
+
+def answer(client, headers, question, choice_index=0):
+    response = client.post("/answers", headers=headers, json={
+        "question_id": question["id"], "choice_id": question["choices"][choice_index]["id"],
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_my_answers_pagination_and_quiz_filter(client, admin_headers, user_headers):
+    questions = [create_question(client, admin_headers, text=f"Q{i}") for i in range(5)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions[:2]])
+    for question in questions:
+        answer(client, user_headers, question)
+
+    assert len(client.get("/my-answers", headers=user_headers).json()) == 5
+    page = client.get("/my-answers?skip=1&limit=2", headers=user_headers).json()
+    assert [item["question_id"] for item in page] == [question["id"] for question in questions[1:3]]
+    filtered = client.get(f"/my-answers?quiz_id={quiz['id']}", headers=user_headers).json()
+    assert sorted(item["question_id"] for item in filtered) == [questions[0]["id"], questions[1]["id"]]
+
+
+def test_my_answers_rejects_out_of_range_paging(client, user_headers):
+    for query in ("limit=-1", "limit=0", "limit=1001", "skip=-1"):
+        assert client.get(f"/my-answers?{query}", headers=user_headers).status_code == 422, query
@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+import database
+from cache import payload_cache
+
+from conftest import create_question, create_quiz
+
+
+@contextmanager
+def count_statements():
+    """Collect every statement the engine executes inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_quizzes(client, headers, quizzes: int, questions_per_quiz: int):
+    """Create quizzes with their own questions, returning the last quiz"""
+    quiz = None
+    for quiz_number in range(quizzes):
+        question_ids = [
+            create_question(client, headers, text=f"Quiz {quiz_number} question {number}", choices=3)["id"]
+            for number in range(questions_per_quiz)
+        ]
+        quiz = create_quiz(client, headers, question_ids, title=f"Quiz {quiz_number}")
+    return quiz
+
+
+def uncached_statements(client, url: str) -> list:
+    """Statements executed by an uncached GET of url"""
+    payload_cache.clear()
+    with count_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+def test_quiz_list_statement_count_is_independent_of_size(client, admin_headers):
+    seed_quizzes(client, admin_headers, quizzes=2, questions_per_quiz=2)
+    small = uncached_statements(client, "/quizzes")
+
+    seed_quizzes(client, admin_headers, quizzes=8, questions_per_quiz=5)
+    large = uncached_statements(client, "/quizzes")
+
+    assert len(client.get("/quizzes").json()) == 10
+    assert 0 < len(large) == len(small), large
+
+
+def test_quiz_detail_statement_count_is_independent_of_size(client, admin_headers):
+    small_quiz = seed_quizzes(client, admin_headers, quizzes=1, questions_per_quiz=1)
+    small = uncached_statements(client, f"/quizzes/{small_quiz['id']}")
+
+    large_quiz = seed_quizzes(client, admin_headers, quizzes=1, questions_per_quiz=12)
+    large = uncached_statements(client, f"/quizzes/{large_quiz['id']}")
+
+    assert len(client.get(f"/quizzes/{large_quiz['id']}").json()["questions"]) == 12
+    assert 0 < len(large) == len(small), large
@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+import database
+from cache import payload_cache
+
+from conftest import create_question, create_quiz
+
+
+@contextmanager
+def capture_statements():
+    """Collect (statement, parameters) of every SELECT, UPDATE and DELETE the engine executes inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # executemany batches are INSERTs or primary-key UPDATEs
+        if not executemany and statement.split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(connection, statement, parameters) -> list:
+    """SCAN steps of the statement's SQLite query plan that read a whole table"""
+    plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    scans = [step for step in plan if step.startswith("SCAN") and " USING " not in step]
+    # A page read in storage order stops after LIMIT rows, e.g. the quiz list
+    sql = " ".join(statement.split())
+    if scans == plan and " LIMIT " in sql and " WHERE " not in sql:
+        return []
+    return scans
+
+
+def exercise_hot_endpoints(client, admin_headers, user_headers):
+    questions = [create_question(client, admin_headers, text=f"Question {number}", choices=3) for number in range(3)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+    user_id = client.get("/me", headers=user_headers).json()["id"]
+    payload_cache.clear()
+
+    for question in questions:
+        response = client.post("/answers", headers=user_headers, json={
+            "question_id": question["id"], "choice_id": question["choices"][0]["id"],
+        })
+        assert response.status_code == 200, response.text
+    response = client.post(f"/quizzes/{quiz['id']}/attempts", headers=user_headers, json={
+        "answers": [{"question_id": question["id"], "choice_id": question["choices"][1]["id"]} for question in questions]
+    })
+    assert response.status_code == 200, response.text
+
+    for url in [
+        "/quizzes", f"/quizzes/{quiz['id']}", f"/questions/{questions[0]['id']}",
+        "/my-answers", f"/my-answers?quiz_id={quiz['id']}", "/leaderboard", f"/users/{user_id}/rank",
+        f"/quiz-scores/{quiz['id']}", f"/quiz-scores/{quiz['id']}/top", f"/quiz-scores/{quiz['id']}/me",
+        f"/quiz-scores/{quiz['id']}/around-me", f"/my-quiz-score/{quiz['id']}", "/my-quiz-scores",
+    ]:
+        response = client.get(url, headers=user_headers)
+        assert response.status_code == 200, (url, response.text)
+
+    for url in [f"/my-answers/{questions[0]['id']}", f"/quizzes/{quiz['id']}/reset-answers", f"/my-quiz-score/{quiz['id']}"]:
+        response = client.delete(url, headers=user_headers)
+        assert response.status_code == 200, (url, response.text)
+
+
+def test_hot_statements_use_indexes(client, admin_headers, user_headers):
+    with capture_statements() as statements:
+        exercise_hot_endpoints(client, admin_headers, user_headers)
+    assert statements
+
+    with database.engine.connect() as connection:
+        scanning = [
+            (scans, " ".join(statement.split()))
+            for statement, parameters in statements
+            if (scans := full_scans(connection, statement, parameters))
+        ]
+    assert not scanning, "\n".join(f"{' | '.join(scans)}: {sql}" for scans, sql in scanning)
@@ -0,0 +1,126 @@
+import json
+
+import stats
+from database import AnswerStat
+
+from conftest import create_question, create_quiz
+
+
+def counters(db):
+    db.expire_all()
+    return {(stat.scope, stat.key): (stat.total, stat.correct) for stat in db.query(AnswerStat) if stat.total or stat.correct}
+
+
+def rebuilt_counters(db):
+    stats.reconcile(db)
+    return counters(db)
+
+
+def assert_consistent(client, admin_headers, db):
+    summary = client.get("/admin/statistics", headers=admin_headers).json()
+    for entry in [summary] + summary["per_quiz"] + summary["per_day"]:
+        total = entry.get("total_answers", 0)
+        correct = entry["correct_answers"]
+        assert 0 <= correct <= total, entry
+    running = counters(db)
+    assert running == rebuilt_counters(db)
+
+
+def flip_correct_choice(client, admin_headers, question):
+    choices = [
+        {"id": choice["id"], "choice_text": choice["choice_text"], "is_correct": not choice["is_correct"]}
+        for choice in question["choices"]
+    ]
+    response = client.put(f"/questions/{question['id']}", headers=admin_headers, json={
+        "question_text": question["question_text"], "score": question["score"], "choices": choices,
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_reset_after_correct_choice_changes(client, admin_headers, user_headers, db):
+    question = create_question(client, admin_headers, correct=0)
+    create_quiz(client, admin_headers, [question["id"]])
+    correct_choice = question["choices"][0]["id"]
+    response = client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": correct_choice})
+    assert response.json()["is_correct"] is True
+
+    flip_correct_choice(client, admin_headers, question)
+    assert client.delete(f"/my-answers/{question['id']}", headers=user_headers).status_code == 200
+
+    summary = client.get("/admin/statistics", headers=admin_headers).json()
+    assert (summary["total_answers"], summary["correct_answers"]) == (0, 0)
+    assert_consistent(client, admin_headers, db)
+
+
+def test_reanswer_and_quiz_attempt_after_edit(client, admin_headers, user_headers, db):
+    questions = [create_question(client, admin_headers, text=f"Q{i}", correct=0) for i in range(3)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+    for question in questions:
+        client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": question["choices"][0]["id"]})
+
+    flip_correct_choice(client, admin_headers, questions[0])
+    # Replacing answers (single and as a quiz attempt) decrements what was recorded, then adds the new grading
+    client.post("/answers", headers=user_headers, json={"question_id": questions[0]["id"], "choice_id": questions[0]["choices"][0]["id"]})
+    response = client.post(f"/quizzes/{quiz['id']}/attempts", headers=user_headers, json={"answers": [
+        {"question_id": question["id"], "choice_id": question["choices"][0]["id"]} for question in questions
+    ]})
+    assert response.status_code == 200, response.text
+    assert_consistent(client, admin_headers, db)
+
+    flip_correct_choice(client, admin_headers, questions[1])
+    assert client.delete(f"/quizzes/{quiz['id']}/reset-answers", headers=user_headers).status_code == 200
+    summary = client.get("/admin/statistics", headers=admin_headers).json()
+    assert (summary["total_answers"], summary["correct_answers"]) == (0, 0)
+    assert_consistent(client, admin_headers, db)
+
+
+def test_quiz_counters_follow_question_links(client, admin_headers, user_headers, db):
+    first = create_question(client, admin_headers, text="First")
+    second = create_question(client, admin_headers, text="Second")
+    for question in (first, second):
+        client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": question["choices"][0]["id"]})
+
+    # Questions that already have answers bring them into a new quiz...
+    quiz = create_quiz(client, admin_headers, [first["id"]])
+    assert counters(db)[("quiz", str(quiz["id"]))] == (1, 1)
+    # ...and into an existing one, and take them out again when unlinked
+    response = client.put(f"/quizzes/{quiz['id']}", headers=admin_headers, json={"title": "Quiz", "questions": [second["id"]]})
+    assert response.json()["changes"]["questions_added"] == [second["id"]]
+    assert_consistent(client, admin_headers, db)
+
+    assert client.delete(f"/my-answers/{second['id']}", headers=user_headers).status_code == 200
+    assert ("quiz", str(quiz["id"])) not in counters(db)
+    assert_consistent(client, admin_headers, db)
+
+
+def test_recreated_quiz_starts_from_zero(client, admin_headers, user_headers, db):
+    questions = [create_question(client, admin_headers, text=f"Q{i}") for i in range(4)]
+    quiz = create_quiz(client, admin_headers, [question["id"] for question in questions])
+    for question in questions:
+        client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": question["choices"][0]["id"]})
+    assert client.delete(f"/quizzes/{quiz['id']}", headers=admin_headers).status_code == 200
+    assert ("quiz", str(quiz["id"])) not in counters(db)
+
+    # SQLite hands the freed id to the next quiz
+    recreated = create_quiz(client, admin_headers, [questions[0]["id"]])
+    assert recreated["id"] == quiz["id"]
+    summary = client.get("/admin/statistics", headers=admin_headers).json()
+    [entry] = [entry for entry in summary["per_quiz"] if entry["quiz_id"] == recreated["id"]]
+    assert (entry["total_answers"], entry["correct_answers"]) == (1, 1)
+    assert_consistent(client, admin_headers, db)
+
+
+def test_answer_views_agree_with_counters_after_edit(client, admin_headers, user_headers, db):
+    question = create_question(client, admin_headers, correct=0)
+    client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": question["choices"][0]["id"]})
+    flip_correct_choice(client, admin_headers, question)
+
+    # Every view reports the correctness the answer was graded with, as the counters do
+    [accuracy] = client.get("/admin/statistics/questions", headers=admin_headers).json()
+    assert (accuracy["total_answers"], accuracy["correct_answers"]) == (1, 1)
+    [answer] = client.get("/my-answers", headers=user_headers).json()
+    assert answer["is_correct"] is True
+    [exported] = [json.loads(line) for line in client.get("/admin/export/answers", headers=admin_headers).text.splitlines()]
+    assert exported["is_correct"] is True
+    [item] = client.get("/admin/analytics/questions", headers=admin_headers).json()
+    assert item["p_value"] == 1.0
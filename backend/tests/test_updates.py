@@ -0,0 +1,108 @@
+from database import Choice
+
+from conftest import create_question, create_quiz
+
+
+def put_question(client, headers, question, choices, **fields):
+    return client.put(f"/questions/{question['id']}", headers=headers, json={
+        "question_text": fields.get("question_text", question["question_text"]),
+        "score": fields.get("score", question["score"]),
+        "choices": choices,
+    })
+
+
+def test_unchanged_question_keeps_choice_ids_and_writes_nothing(client, admin_headers):
+    question = create_question(client, admin_headers, choices=3)
+
+    # Choices matched by id, and by text when sent without one
+    choices = [{"id": choice["id"], "choice_text": choice["choice_text"], "is_correct": choice["is_correct"]} for choice in question["choices"][:2]]
+    choices.append({"choice_text": question["choices"][2]["choice_text"], "is_correct": question["choices"][2]["is_correct"]})
+    response = put_question(client, admin_headers, question, choices)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [choice["id"] for choice in body["choices"]] == [choice["id"] for choice in question["choices"]]
+    assert body["changes"] == {"fields": [], "choices_added": [], "choices_updated": [], "choices_removed": []}
+
+
+def test_edited_choice_keeps_its_id_and_new_choice_is_added(client, admin_headers):
+    question = create_question(client, admin_headers, choices=2)
+    first, second = question["choices"]
+    response = put_question(client, admin_headers, question, [
+        {"id": first["id"], "choice_text": "Edited", "is_correct": first["is_correct"]},
+        {"id": second["id"], "choice_text": second["choice_text"], "is_correct": second["is_correct"]},
+        {"choice_text": "New", "is_correct": False},
+    ], score=20.0)
+
+    assert response.status_code == 200, response.text
+    changes = response.json()["changes"]
+    assert changes["fields"] == ["score"]
+    assert changes["choices_updated"] == [first["id"]]
+    assert changes["choices_removed"] == []
+    [added_id] = changes["choices_added"]
+    choices = {choice["id"]: choice["choice_text"] for choice in response.json()["choices"]}
+    assert choices == {first["id"]: "Edited", second["id"]: second["choice_text"], added_id: "New"}
+
+
+def test_removed_choice_is_deleted(client, admin_headers, db):
+    question = create_question(client, admin_headers, choices=3)
+    kept = question["choices"][:2]
+    response = put_question(client, admin_headers, question, [
+        {"id": choice["id"], "choice_text": choice["choice_text"], "is_correct": choice["is_correct"]} for choice in kept
+    ])
+
+    assert response.status_code == 200, response.text
+    removed_id = question["choices"][2]["id"]
+    assert response.json()["changes"]["choices_removed"] == [removed_id]
+    assert db.get(Choice, removed_id) is None
+    assert [choice["id"] for choice in response.json()["choices"]] == [choice["id"] for choice in kept]
+
+
+def test_removing_an_answered_choice_is_refused(client, admin_headers, user_headers, db):
+    question = create_question(client, admin_headers, choices=2)
+    answered = question["choices"][1]
+    response = client.post("/answers", headers=user_headers, json={"question_id": question["id"], "choice_id": answered["id"]})
+    assert response.status_code == 200, response.text
+
+    first = question["choices"][0]
+    response = put_question(client, admin_headers, question, [
+        {"id": first["id"], "choice_text": first["choice_text"], "is_correct": first["is_correct"]}
+    ], question_text="Edited")
+
+    assert response.status_code == 400
+    assert str(answered["id"]) in response.json()["detail"]
+    # Nothing of the refused update was applied
+    db.expire_all()
+    assert db.get(Choice, answered["id"]) is not None
+    assert client.get(f"/questions/{question['id']}", headers=admin_headers).json()["question_text"] == question["question_text"]
+
+
+def test_choice_of_another_question_is_refused(client, admin_headers):
+    question = create_question(client, admin_headers, text="First")
+    other = create_question(client, admin_headers, text="Second")
+    foreign = other["choices"][0]
+    response = put_question(client, admin_headers, question, [
+        {"id": foreign["id"], "choice_text": foreign["choice_text"], "is_correct": True}
+    ])
+    assert response.status_code == 400
+
+
+def test_quiz_update_reports_only_what_changed(client, admin_headers):
+    questions = [create_question(client, admin_headers, text=f"Q{i}") for i in range(3)]
+    quiz = create_quiz(client, admin_headers, [questions[0]["id"], questions[1]["id"]], title="Quiz")
+    payload = {"title": "Quiz", "questions": [questions[0]["id"], questions[1]["id"]]}
+
+    response = client.put(f"/quizzes/{quiz['id']}", headers=admin_headers, json=payload)
+    assert response.status_code == 200, response.text
+    assert response.json()["changes"] == {"fields": [], "questions_added": [], "questions_removed": []}
+
+    response = client.put(f"/quizzes/{quiz['id']}", headers=admin_headers, json={
+        "title": "Renamed", "questions": [questions[1]["id"], questions[2]["id"]]
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["changes"] == {
+        "fields": ["title"], "questions_added": [questions[2]["id"]], "questions_removed": [questions[0]["id"]]
+    }
+    detail = client.get(f"/quizzes/{quiz['id']}").json()
+    assert detail["title"] == "Renamed"
+    assert sorted(question["id"] for question in detail["questions"]) == [questions[1]["id"], questions[2]["id"]]